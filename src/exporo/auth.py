@@ -6,140 +6,313 @@ Handles user registration, login, and database operations
 import streamlit as st
 import sqlite3
 import hashlib
-import time
+import hmac
+import html
 import re
 import json
-import asyncio
+import orjson
 import concurrent.futures
+import copy
 import threading
+import atexit
+import queue
 from datetime import datetime
-from .config import DATABASE_NAME, DEFAULT_EXTRACTED_DATA
-import uuid
+from .config import DATABASE_NAME, make_default_extracted_data
+import os
+from contextlib import contextmanager
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerifyMismatchError
+
+# Argon2id hasher for stored passwords, pinned to the OWASP profile
+# (46 MiB, 3 passes, 1 lane; ~100 ms per hash) so library upgrades don't
+# silently change costs; rows hashed with other params are upgraded on login
+_password_hasher = PasswordHasher(time_cost=3, memory_cost=46 * 1024, parallelism=1)
+
+# Argon2 work runs on this pool: it releases the GIL, and the pool caps how
+# many 46 MiB memory fills run at once when logins/signups burst
+_HASH_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix="argon2"
+)
+
+# Verified against on unknown emails so both login failure paths cost the same
+_DUMMY_HASH = _password_hasher.hash("not-a-real-password")
+
+# Single message for unknown email and wrong password alike
+_LOGIN_FAILED_MESSAGE = "Invalid email or password!"
+
+# Email format accepted at signup
+EMAIL_RE = re.compile(r"^[^\s@]+@[^\s@]+\.[^\s@]+$")
+
+# Signup checks as (fails(fields), message), over the stripped form fields, in
+# the order their messages are shown
+_SIGNUP_RULES = (
+    (lambda f: not f["first_name"], "First Name wajib diisi"),
+    (lambda f: not f["last_name"], "Last Name wajib diisi"),
+    (lambda f: not f["email"], "Email wajib diisi"),
+    (lambda f: not f["password"], "Password wajib diisi"),
+    (lambda f: len(f["password"]) < 6, "Password minimal 6 karakter"),
+    (lambda f: not f["confirm_password"], "Confirm Password wajib diisi"),
+    (
+        lambda f: f["password"] != f["confirm_password"],
+        "Password dan Confirm Password tidak sama",
+    ),
+    (
+        lambda f: not f["terms_agreed"],
+        "Harap setujui syarat dan ketentuan terlebih dahulu",
+    ),
+    (
+        lambda f: f["email"] and not EMAIL_RE.match(f["email"]),
+        "Format email tidak valid",
+    ),
+)
+
+# Rows per page in the business profile's assessment history table
+ASSESSMENT_PAGE_SIZE = 20
+
+
+# SQL statements, hoisted so sqlite3's per-connection statement cache reuses them
+_SQL_CREATE_USERS = """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        first_name TEXT NOT NULL,
+        last_name TEXT NOT NULL,
+        email TEXT UNIQUE NOT NULL COLLATE NOCASE,
+        phone TEXT,
+        password_hash TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+# Databases created before the email column was declared NOCASE get an
+# explicit unique NOCASE index, so case-insensitive lookups probe an index and
+# case variants collide; newer ones already have it as the column's autoindex
+_SQL_CREATE_EMAIL_INDEX = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email_nocase "
+    "ON users(email COLLATE NOCASE)"
+)
+_SQL_DROP_EMAIL_INDEX = "DROP INDEX IF EXISTS idx_users_email_nocase"
+# Earlier non-unique NOCASE index, superseded by either of the above
+_SQL_DROP_OLD_EMAIL_INDEX = "DROP INDEX IF EXISTS idx_users_email"
+_SQL_CREATE_MEMORY_BOT_DATA = """
+    CREATE TABLE IF NOT EXISTS memory_bot_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        memory_data BLOB NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        UNIQUE(user_id)
+    )
+"""
+# Yields no row when the email is already taken (UNIQUE conflict ignored)
+_SQL_INSERT_USER = (
+    "INSERT OR IGNORE INTO users (first_name, last_name, email, phone, password_hash) "
+    "VALUES (?, ?, ?, ?, ?) RETURNING id"
+)
+_SQL_LOGIN = (
+    "SELECT id, first_name, last_name, email, password_hash FROM users "
+    "WHERE email = ? COLLATE NOCASE LIMIT 1"
+)
+_SQL_UPDATE_PASSWORD_HASH = "UPDATE users SET password_hash = ? WHERE id = ?"
+_SQL_USER_COUNT = "SELECT COUNT(*) FROM users"
+# Upsert in place on the UNIQUE(user_id) index, keeping the row's id and created_at
+_SQL_SAVE_MEMORY = (
+    "INSERT INTO memory_bot_data (user_id, memory_data) VALUES (?, ?) "
+    "ON CONFLICT(user_id) DO UPDATE SET "
+    "memory_data = excluded.memory_data, updated_at = CURRENT_TIMESTAMP"
+)
+_SQL_LOAD_MEMORY = "SELECT memory_data FROM memory_bot_data WHERE user_id = ?"
+
+# Columns of a users row kept in st.session_state.user after login
+_SESSION_USER_FIELDS = ("id", "first_name", "last_name", "email")
+
+# Serializes writes on the dedicated writer connection across script threads
+_DB_WRITE_LOCK = threading.Lock()
+
+# Idle reader connections; WAL lets them read while the writer commits
+READ_POOL_SIZE = 4
+_READ_POOL = queue.Queue(maxsize=READ_POOL_SIZE)
+
+
+def _connect():
+    """Open a SQLite connection (WAL, autocommit) shareable across threads"""
+    os.makedirs(os.path.dirname(DATABASE_NAME), exist_ok=True)
+    conn = sqlite3.connect(
+        DATABASE_NAME, check_same_thread=False, isolation_level=None
+    )
+    # Rows are addressable by column name as well as position
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=67108864")  # 64 MiB
+    conn.execute("PRAGMA cache_size=-8000")  # 8 MiB page cache
+    return conn
+
+
+@st.cache_resource
+def _writer_conn():
+    """Return the process-wide connection used for all writes"""
+    return _connect()
+
+
+@contextmanager
+def get_conn():
+    """Check out a pooled reader connection, returning it to the pool afterwards"""
+    try:
+        conn = _READ_POOL.get_nowait()
+    except queue.Empty:
+        conn = _connect()
+    try:
+        yield conn
+    finally:
+        try:
+            _READ_POOL.put_nowait(conn)
+        except queue.Full:
+            conn.close()
 
 
+@contextmanager
+def write_transaction():
+    """Run writes on the writer connection as one locked BEGIN IMMEDIATE/COMMIT"""
+    with _DB_WRITE_LOCK:
+        conn = _writer_conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def _has_nocase_unique_email_index(conn, exclude=None) -> bool:
+    """True if users has a unique index on exactly (email COLLATE NOCASE)"""
+    for index in conn.execute("PRAGMA index_list(users)").fetchall():
+        if not index["unique"] or index["name"] == exclude:
+            continue
+        keys = [
+            column
+            for column in conn.execute(f'PRAGMA index_xinfo("{index["name"]}")')
+            if column["key"]
+        ]
+        if (
+            len(keys) == 1
+            and keys[0]["name"] == "email"
+            and (keys[0]["coll"] or "").upper() == "NOCASE"
+        ):
+            return True
+    return False
+
+
+@st.cache_resource
 def init_db():
-    """Initialize the SQLite database"""
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            first_name TEXT NOT NULL,
-            last_name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            phone TEXT,
-            password_hash TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS memory_bot_data (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            memory_data TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id),
-            UNIQUE(user_id)
-        )
-    """)
+    """Initialize the SQLite database (once per process)"""
+    with write_transaction() as conn:
+        conn.execute(_SQL_CREATE_USERS)
+        conn.execute(_SQL_CREATE_MEMORY_BOT_DATA)
+        if _has_nocase_unique_email_index(conn, exclude="idx_users_email_nocase"):
+            conn.execute(_SQL_DROP_EMAIL_INDEX)
+            conn.execute(_SQL_DROP_OLD_EMAIL_INDEX)
+            return True
+    try:
+        with write_transaction() as conn:
+            conn.execute(_SQL_CREATE_EMAIL_INDEX)
+            conn.execute(_SQL_DROP_OLD_EMAIL_INDEX)
+    except sqlite3.IntegrityError:
+        # Legacy rows differing only in email case; keep the old index
+        print("Duplicate emails (case-insensitive) found; unique email index not created")
+    return True
+
 
-    conn.commit()
-    conn.close()
+def normalize_email(email: str) -> str:
+    """Canonical form emails are stored and looked up in"""
+    return email.strip().lower()
 
 
 def hash_password(password):
-    """Hash password using SHA-256"""
+    """Hash password using Argon2id"""
+    return _HASH_POOL.submit(_password_hasher.hash, password).result()
+
+
+def _legacy_sha256(password):
+    """Hash password the pre-Argon2 way (unsalted SHA-256), for migrating old rows"""
     return hashlib.sha256(password.encode()).hexdigest()
 
 
+def verify_password(stored_hash, password):
+    """Check a password against its stored hash; return (ok, needs_rehash)"""
+    if not stored_hash.startswith("$argon2"):
+        # Legacy SHA-256 row: accept once and upgrade to Argon2id
+        ok = hmac.compare_digest(stored_hash, _legacy_sha256(password))
+        return ok, ok
+    try:
+        _HASH_POOL.submit(_password_hasher.verify, stored_hash, password).result()
+    except (VerifyMismatchError, InvalidHashError):
+        return False, False
+    return True, _password_hasher.check_needs_rehash(stored_hash)
+
+
 def register_user(first_name, last_name, email, phone, password):
     """Register a new user in the database"""
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-
+        email = normalize_email(email)
         password_hash = hash_password(password)
 
-        cursor.execute(
-            """
-            INSERT INTO users (first_name, last_name, email, phone, password_hash)
-            VALUES (?, ?, ?, ?, ?)
-        """,
-            (first_name, last_name, email, phone, password_hash),
-        )
-
-        conn.commit()
-        conn.close()
+        with write_transaction() as conn:
+            # fetchall() steps the statement to completion before COMMIT
+            inserted = conn.execute(
+                _SQL_INSERT_USER,
+                (first_name, last_name, email, phone, password_hash),
+            ).fetchall()
+
+        if not inserted:
+            return False, "Email sudah terdaftar, silakan gunakan email lain"
+        # The footer count must include the new user on its next read
+        _user_count.clear()
         return True, "Registration successful!"
 
-    except sqlite3.IntegrityError:
-        conn.close()
-        return False, "Email already exists!"
     except Exception as e:
-        conn.close()
         return False, f"Registration failed: {str(e)}"
 
 
 def login_user(email, password):
     """Authenticate user login"""
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-
-        password_hash = hash_password(password)
-
-        cursor.execute(
-            """
-            SELECT id, first_name, last_name, email FROM users 
-            WHERE email = ? AND password_hash = ?
-        """,
-            (email, password_hash),
-        )
-
-        user = cursor.fetchone()
-        conn.close()
+        with get_conn() as conn:
+            user = conn.execute(_SQL_LOGIN, (normalize_email(email),)).fetchone()
 
         if user:
-            return True, {
-                "id": user[0],
-                "first_name": user[1],
-                "last_name": user[2],
-                "email": user[3],
-            }
+            ok, needs_rehash = verify_password(user["password_hash"], password)
+            if not ok:
+                return False, _LOGIN_FAILED_MESSAGE
+            if needs_rehash:
+                # Hash before taking the write lock; Argon2 takes ~100 ms
+                new_hash = hash_password(password)
+                with write_transaction() as write_conn:
+                    write_conn.execute(_SQL_UPDATE_PASSWORD_HASH, (new_hash, user["id"]))
+            return True, {key: user[key] for key in _SESSION_USER_FIELDS}
         else:
-            return False, "Invalid email or password!"
+            # Burn the same Argon2 cost as a real check before failing
+            verify_password(_DUMMY_HASH, password)
+            return False, _LOGIN_FAILED_MESSAGE
 
     except Exception as e:
         return False, f"Login failed: {str(e)}"
 
 
-def check_email_exists(email):
-    """Check if email already exists"""
-    try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
+# st.cache_data does not store a call that raises, so a transient DB error
+# is retried on the next rerun instead of being served for the whole TTL
+@st.cache_data(ttl=60, show_spinner=False)
+def _user_count() -> int:
+    """Count registered users (refreshed at most once a minute)"""
+    with get_conn() as conn:
+        return conn.execute(_SQL_USER_COUNT).fetchone()[0]
 
-        cursor.execute("SELECT COUNT(*) FROM users WHERE email = ?", (email,))
-        count = cursor.fetchone()[0]
-        conn.close()
 
-        return count > 0
-    except Exception:
-        return False
-
-
-def get_user_count():
+def get_user_count() -> int:
     """Get total number of registered users"""
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM users")
-        user_count = cursor.fetchone()[0]
-        conn.close()
-        return user_count
+        return _user_count()
     except Exception:
         return 0
 
@@ -206,20 +379,17 @@ def save_memory_bot_data(user_id: int, memory_data: dict):
         if not filtered_data or filtered_data == {"extraction_timestamp": filtered_data.get("extraction_timestamp"), "conversation_language": filtered_data.get("conversation_language")}:
             return True, "No meaningful data to save - skipped database operation"
         
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-        
-        # Convert filtered memory data to JSON string
-        memory_json = json.dumps(filtered_data, ensure_ascii=False, default=str)
+        # Serialize to UTF-8 JSON bytes, bound as a BLOB with no str copy;
+        # older databases declare the column TEXT, which stores blobs unchanged
+        memory_json = orjson.dumps(filtered_data, default=str)
         
-        # Use INSERT OR REPLACE for upsert behavior
-        cursor.execute("""
-            INSERT OR REPLACE INTO memory_bot_data (user_id, memory_data, updated_at)
-            VALUES (?, ?, CURRENT_TIMESTAMP)
-        """, (user_id, memory_json))
-        
-        conn.commit()
-        conn.close()
+        # Upsert: update the user's row in place, or insert the first one
+        with write_transaction() as conn:
+            conn.execute(_SQL_SAVE_MEMORY, (user_id, memory_json))
+
+        # Invalidate cached dashboard data so the next render sees this write
+        from .dashboard import get_dashboard_data
+        get_dashboard_data.clear(user_id)
         
         # Count meaningful fields saved
         meaningful_count = sum(1 for key, value in filtered_data.items() 
@@ -228,34 +398,44 @@ def save_memory_bot_data(user_id: int, memory_data: dict):
         return True, f"Memory Bot data saved successfully! ({meaningful_count} meaningful fields)"
         
     except Exception as e:
-        if 'conn' in locals():
-            conn.close()
         return False, f"Failed to save Memory Bot data: {str(e)}"
 
 def load_memory_bot_data(user_id: int) -> dict:
     """Load Memory Bot data from database"""
+    # A debounced auto-save not yet written is newer than the stored row
+    with _pending_saves_lock:
+        pending = _pending_saves.get(user_id)
+    if pending is not None:
+        return copy.deepcopy(pending)
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT memory_data FROM memory_bot_data WHERE user_id = ?
-        """, (user_id,))
-        
-        result = cursor.fetchone()
-        conn.close()
+        with get_conn() as conn:
+            result = conn.execute(_SQL_LOAD_MEMORY, (user_id,)).fetchone()
         
         if result:
             # Parse JSON data
-            memory_data = json.loads(result[0])
+            # bytes for BLOB rows, str for rows written before the switch
+            memory_data = orjson.loads(result[0])
             return memory_data
         else:
             # Return default data if no saved data found
-            return DEFAULT_EXTRACTED_DATA.copy()
+            return make_default_extracted_data()
             
     except Exception as e:
         print(f"Error loading Memory Bot data: {e}")
-        return DEFAULT_EXTRACTED_DATA.copy()
+        return make_default_extracted_data()
+
+
+# One background writer so queued Memory Bot saves land in submission order
+_SAVE_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="memory-bot-save"
+)
+
+# Auto-saves for a user within this window coalesce into one write (one
+# commit/fsync) of the latest snapshot
+SAVE_DEBOUNCE_SECONDS = 2.0
+_pending_saves = {}
+_scheduled_flushes = set()
+_pending_saves_lock = threading.Lock()
 
 
 class AsyncDatabaseOperations:
@@ -267,30 +447,84 @@ class AsyncDatabaseOperations:
         return operation_func(*args, **kwargs)
     
     @staticmethod
-    def save_memory_bot_data_async(user_id: int, memory_data: dict):
-        """Save Memory Bot data asynchronously (only meaningful values)"""
-        def _save_operation():
-            # Check if there's meaningful data before proceeding
-            filtered_data = filter_meaningful_data(memory_data)
-            meaningful_count = sum(1 for key, value in filtered_data.items() 
-                                 if key not in ["extraction_timestamp", "conversation_language"])
-            
-            if meaningful_count > 0:
-                print(f"💾 Async save: {meaningful_count} meaningful fields for user {user_id}")
-                return save_memory_bot_data(user_id, memory_data)
-            else:
-                print(f"⏭️ Async save skipped: No meaningful data for user {user_id}")
-                return True, "No meaningful data to save - skipped database operation"
+    def _save_operation(user_id: int, memory_data: dict):
+        """Save Memory Bot data if it holds any meaningful values"""
+        filtered_data = filter_meaningful_data(memory_data)
+        meaningful_count = sum(1 for key, value in filtered_data.items() 
+                             if key not in ["extraction_timestamp", "conversation_language"])
         
-        # Run in thread pool to avoid blocking
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(_save_operation)
-            try:
-                return future.result(timeout=10)  # 10 second timeout
-            except concurrent.futures.TimeoutError:
-                return False, "Database save operation timed out"
-            except Exception as e:
-                return False, f"Async save error: {str(e)}"
+        if meaningful_count > 0:
+            success, message = save_memory_bot_data(user_id, memory_data)
+        else:
+            success, message = True, "No meaningful data to save - skipped database operation"
+        if not success:
+            print(f"Failed to auto-save Memory Bot data: {message}")
+        return success, message
+
+    @staticmethod
+    def _write_snapshot(user_id: int, memory_data: dict, save):
+        """Write a pending snapshot, unlisting it only once it is committed"""
+        try:
+            return save(user_id, memory_data)
+        finally:
+            # Loads keep seeing the snapshot until the row holds it; a newer
+            # snapshot queued meanwhile stays pending for its own flush
+            with _pending_saves_lock:
+                if _pending_saves.get(user_id) is memory_data:
+                    del _pending_saves[user_id]
+
+    @staticmethod
+    def _flush_pending_save(user_id: int):
+        """Write the newest snapshot queued for a user, if any"""
+        with _pending_saves_lock:
+            _scheduled_flushes.discard(user_id)
+            memory_data = _pending_saves.get(user_id)
+        if memory_data is not None:
+            AsyncDatabaseOperations._write_snapshot(
+                user_id, memory_data, AsyncDatabaseOperations._save_operation
+            )
+
+    @staticmethod
+    def flush_all_pending_saves():
+        """Write every snapshot still waiting on its debounce timer"""
+        with _pending_saves_lock:
+            pending = list(_pending_saves.items())
+        for user_id, memory_data in pending:
+            AsyncDatabaseOperations._write_snapshot(
+                user_id, memory_data, AsyncDatabaseOperations._save_operation
+            )
+
+    @staticmethod
+    def save_memory_bot_data_async(user_id: int, memory_data: dict):
+        """Queue a debounced Memory Bot save without waiting for it (only meaningful values)"""
+        # Snapshot now: the session dict keeps changing on the script thread
+        snapshot = copy.deepcopy(memory_data)
+        with _pending_saves_lock:
+            _pending_saves[user_id] = snapshot
+            scheduled = user_id in _scheduled_flushes
+            _scheduled_flushes.add(user_id)
+        if not scheduled:
+            timer = threading.Timer(
+                SAVE_DEBOUNCE_SECONDS,
+                _SAVE_POOL.submit,
+                args=(AsyncDatabaseOperations._flush_pending_save, user_id),
+            )
+            timer.daemon = True
+            timer.start()
+
+    @staticmethod
+    def save_memory_bot_data_now(user_id: int, memory_data: dict):
+        """Save Memory Bot data immediately, superseding any pending auto-save"""
+        snapshot = copy.deepcopy(memory_data)
+        with _pending_saves_lock:
+            _pending_saves[user_id] = snapshot
+        # Through the save pool so it lands after any auto-save already running
+        return _SAVE_POOL.submit(
+            AsyncDatabaseOperations._write_snapshot,
+            user_id,
+            snapshot,
+            save_memory_bot_data,
+        ).result()
     
     @staticmethod
     def load_memory_bot_data_async(user_id: int):
@@ -305,28 +539,33 @@ class AsyncDatabaseOperations:
                 return future.result(timeout=10)  # 10 second timeout
             except concurrent.futures.TimeoutError:
                 print("Database load operation timed out, returning default data")
-                return DEFAULT_EXTRACTED_DATA.copy()
+                return make_default_extracted_data()
             except Exception as e:
                 print(f"Async load error: {str(e)}, returning default data")
-                return DEFAULT_EXTRACTED_DATA.copy()
+                return make_default_extracted_data()
+
+
+# Debounce timers are daemon threads; write what they still hold on shutdown
+# (runs after the save pool has drained, so on the exiting thread)
+atexit.register(AsyncDatabaseOperations.flush_all_pending_saves)
 
 
 def init_auth_session_state():
     """Initialize authentication-related session state"""
-    if "page" not in st.session_state:
-        st.session_state.page = "login"
-    if "user" not in st.session_state:
-        st.session_state.user = None
-    if "logged_in" not in st.session_state:
-        st.session_state.logged_in = False
+    ss = st.session_state
+    if "page" not in ss:
+        ss.page = "login"
+    if "user" not in ss:
+        ss.user = None
+    if "logged_in" not in ss:
+        ss.logged_in = False
 
 
 def reset_user_data():
     """Reset user-specific data on logout"""
-    st.session_state.messages = []
-    st.session_state.user_id = str(uuid.uuid4())
-    st.session_state.extracted_data = DEFAULT_EXTRACTED_DATA.copy()
-    st.session_state.memory_bot = DEFAULT_EXTRACTED_DATA.copy()
+    from .chat import reset_chat
+
+    reset_chat()
 
 
 def show_login_page():
@@ -351,20 +590,24 @@ def show_login_page():
         st.markdown("## Login")
         st.markdown("Masuk ke akun Anda untuk mengakses platform Exporo")
 
-        # Login form
-        email = st.text_input("Email", placeholder="Masukkan email Anda")
-        password = st.text_input(
-            "Password", type="password", placeholder="Masukkan password Anda"
-        )
+        # Login form; inputs only rerun the script on submit
+        with st.form("login_form", border=False):
+            email = st.text_input("Email", placeholder="Masukkan email Anda")
+            password = st.text_input(
+                "Password", type="password", placeholder="Masukkan password Anda"
+            )
+
+            st.checkbox("Ingat saya")
 
-        st.checkbox("Ingat saya")
+            submitted = st.form_submit_button(
+                "Masuk", type="primary", use_container_width=True
+            )
 
-        if st.button("Masuk", type="primary", use_container_width=True):
+        if submitted:
             if not email or not password:
                 st.error("Harap isi email dan password")
             else:
                 with st.spinner("Memverifikasi akun..."):
-                    time.sleep(1)
                     success, result = login_user(email, password)
 
                 if success:
@@ -407,73 +650,64 @@ def show_signup_page():
             "Mari kita siapkan semuanya agar kamu bisa mengakses akun pribadimu."
         )
 
-        # Form fields
-        col_fname, col_lname = st.columns(2)
-        with col_fname:
-            first_name = st.text_input("First Name", placeholder="Masukkan nama depan")
-        with col_lname:
-            last_name = st.text_input("Last Name", placeholder="Masukkan nama belakang")
-
-        col_email, col_phone = st.columns(2)
-        with col_email:
-            email = st.text_input("Email", placeholder="contoh@email.com")
-        with col_phone:
-            phone = st.text_input("Phone Number", placeholder="08xxxxxxxxxx")
-
-        password = st.text_input(
-            "Password", type="password", placeholder="Minimal 6 karakter"
-        )
-        confirm_password = st.text_input(
-            "Confirm Password", type="password", placeholder="Ulangi password"
-        )
+        # Form fields; inputs only rerun the script on submit
+        with st.form("signup_form", border=False):
+            col_fname, col_lname = st.columns(2)
+            with col_fname:
+                first_name = st.text_input("First Name", placeholder="Masukkan nama depan")
+            with col_lname:
+                last_name = st.text_input("Last Name", placeholder="Masukkan nama belakang")
+
+            col_email, col_phone = st.columns(2)
+            with col_email:
+                email = st.text_input("Email", placeholder="contoh@email.com")
+            with col_phone:
+                phone = st.text_input("Phone Number", placeholder="08xxxxxxxxxx")
+
+            password = st.text_input(
+                "Password", type="password", placeholder="Minimal 6 karakter"
+            )
+            confirm_password = st.text_input(
+                "Confirm Password", type="password", placeholder="Ulangi password"
+            )
+
+            # Terms checkbox
+            terms_agreed = st.checkbox("Saya setuju dengan semua Syarat dan Ketentuan")
+
+            # Sign up button
+            submitted = st.form_submit_button(
+                "Buat Akun", type="primary", use_container_width=True
+            )
 
-        # Terms checkbox
-        terms_agreed = st.checkbox("Saya setuju dengan semua Syarat dan Ketentuan")
-
-        # Sign up button
-        if st.button("Buat Akun", type="primary", use_container_width=True):
-            # Validation
-            errors = []
-
-            if not first_name.strip():
-                errors.append("First Name wajib diisi")
-            if not last_name.strip():
-                errors.append("Last Name wajib diisi")
-            if not email.strip():
-                errors.append("Email wajib diisi")
-            if not password:
-                errors.append("Password wajib diisi")
-            if len(password) < 6:
-                errors.append("Password minimal 6 karakter")
-            if not confirm_password:
-                errors.append("Confirm Password wajib diisi")
-            if password != confirm_password:
-                errors.append("Password dan Confirm Password tidak sama")
-            if not terms_agreed:
-                errors.append("Harap setujui syarat dan ketentuan terlebih dahulu")
-
-            # Email format validation
-            if email and not re.match(r"^[^\s@]+@[^\s@]+\.[^\s@]+$", email):
-                errors.append("Format email tidak valid")
-
-            # Check if email already exists
-            if email and check_email_exists(email):
-                errors.append("Email sudah terdaftar, silakan gunakan email lain")
+        if submitted:
+            # Strip text fields once; passwords are checked as typed
+            fields = {
+                "first_name": first_name.strip(),
+                "last_name": last_name.strip(),
+                "email": email.strip(),
+                "password": password,
+                "confirm_password": confirm_password,
+                "terms_agreed": terms_agreed,
+            }
+            errors = [message for failed, message in _SIGNUP_RULES if failed(fields)]
 
             if errors:
-                for error in errors:
-                    st.error(error)
+                # One element for all messages instead of one per error
+                st.error("\n\n".join(errors))
             else:
                 # Register user
                 with st.spinner("Membuat akun..."):
-                    time.sleep(1.5)
                     success, message = register_user(
-                        first_name, last_name, email, phone, password
+                        fields["first_name"],
+                        fields["last_name"],
+                        fields["email"],
+                        phone,
+                        password,
                     )
 
                 if success:
-                    st.success("Akun berhasil dibuat! Silakan login.")
-                    time.sleep(2)
+                    # Toasts survive st.rerun(), so no pause is needed to show it
+                    st.toast("Akun berhasil dibuat! Silakan login.", icon="✅")
                     st.session_state.page = "login"
                     st.rerun()
                 else:
@@ -485,123 +719,35 @@ def show_signup_page():
         st.markdown("</div>", unsafe_allow_html=True)
 
 
-def show_navigation():
-    """Display navigation buttons"""
-    # Header with navigation
-    col1, col2 = st.columns([3, 2])
-    with col1:
-        st.markdown("### 🚀 Exporo - SME Export Assistant")
-
-    # Navigation buttons
-    if not st.session_state.logged_in:
-        col1, col2, col3, col4, col5 = st.columns(5)
-        with col2:
-            if st.button(
-                "Login",
-                type="secondary" if st.session_state.page != "login" else "primary",
-            ):
-                st.session_state.page = "login"
-                st.rerun()
-        with col4:
-            if st.button(
-                "Sign Up",
-                type="secondary" if st.session_state.page != "signup" else "primary",
-            ):
-                st.session_state.page = "signup"
-                st.rerun()
-    else:
-        # Move navigation to sidebar for logged-in users
-        with st.sidebar:
-            # Dark sidebar styling
-            st.markdown(
-                """
-            <style>
-            .sidebar .block-container {
-                background: linear-gradient(180deg, #2c3e50, #34495e) !important;
-                color: white;
-                border-radius: 0;
-                padding: 2rem 1rem !important;
-            }
-            .sidebar-header {
-                background: linear-gradient(135deg, #2c3e50, #34495e);
-                padding: 1.5rem 1rem;
-                text-align: center;
-                margin: -1rem -1rem 1rem -1rem;
-                border-radius: 0;
-            }
-            .user-profile {
-                display: flex;
-                align-items: center;
-                gap: 0.8rem;
-                margin-bottom: 1rem;
-                padding: 1rem;
-                background: rgba(255,255,255,0.1);
-                border-radius: 10px;
-            }
-            .nav-item {
-                display: flex;
-                align-items: center;
-                gap: 0.8rem;
-                padding: 0.8rem 1rem;
-                margin: 0.3rem 0;
-                border-radius: 8px;
-                color: white;
-                text-decoration: none;
-                transition: all 0.3s ease;
-            }
-            .nav-item:hover {
-                background: rgba(255,255,255,0.1);
-            }
-            .nav-item.active {
-                background: linear-gradient(135deg, #3498db, #2980b9);
-                color: white;
-            }
-            .nav-icon {
-                font-size: 1.2rem;
-                width: 24px;
-            }
-            .stButton > button {
-                font-size: 0.85rem !important;
-            }
-            .stSidebar .stButton > button {
-                background: linear-gradient(135deg, #4a6741, #5a7a51) !important;
-                color: white !important;
-                border: 1px solid rgba(255,255,255,0.2) !important;
-            }
-            .stSidebar .stButton > button:hover {
-                background: linear-gradient(135deg, #5a7a51, #6a8a61) !important;
-            }
-            .stMarkdown {
-                margin-bottom: 0 !important;
-                margin-top: 0 !important;
-            }
-            .stSidebar .stMarkdown {
-                margin: 0 !important;
-                padding: 0 !important;
-            }
-            .stSidebar [data-testid="stMarkdownContainer"] {
-                margin: 0 !important;
-                padding: 0 !important;
-            }
-            </style>
-            """,
-                unsafe_allow_html=True,
-            )
+# Sidebar navigation as (label, widget key, target page, triggers export check)
+SIDEBAR_NAV_ITEMS = (
+    ("📊  Dashboard Progress", "nav_dashboard", "dashboard", False),
+    ("📋  Langkah Ekspor Saya", "nav_langkah", "langkah-ekspor", False),
+    ("👤  Profil Bisnis", "nav_profil", "profil-bisnis", False),
+    ("📄  Persiapan Dokumen", "nav_dokumen", "dokumen", False),
+    ("⭐  Kualitas Produk Saya", "nav_kualitas", "kualitas", False),
+    ("🌍  Export Readiness Check", "nav_export_check", "chat", True),
+    ("🌐  Cek Pasar Global", "nav_pasar", "pasar-global", False),
+    ("💬  Diskusi dengan Exporo", "nav_chat", "chat", False),
+)
+
+
+# Static sidebar brand block for logged-in users
+_SIDEBAR_HEADER_HTML = """
+<div class="sidebar-header">
+    <h3 style="color: white; margin: 0;">🚀 Exporo</h3>
+    <p style="color: rgba(255,255,255,0.8); margin: 0.5rem 0 0 0; font-size: 0.9rem;">SME Export Assistant</p>
+</div>
+"""
 
-            # Header with logo
-            st.markdown(
-                """
-            <div class="sidebar-header">
-                <h3 style="color: white; margin: 0;">🚀 Exporo</h3>
-                <p style="color: rgba(255,255,255,0.8); margin: 0.5rem 0 0 0; font-size: 0.9rem;">SME Export Assistant</p>
-            </div>
-            """,
-                unsafe_allow_html=True,
-            )
 
-            # User profile and navigation combined to eliminate gaps
-            st.markdown(
-                f"""
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
+def sidebar_profile_html(first_name: str, last_name: str, email: str) -> str:
+    """Render the sidebar user card once per user (names are HTML-escaped)"""
+    initial = html.escape(first_name[:1].upper())
+    full_name = html.escape(f"{first_name} {last_name}")
+    email = html.escape(email)
+    return f"""
             <!-- User profile section -->
             <div style="
                 background: linear-gradient(135deg, rgba(52, 152, 219, 0.3), rgba(41, 128, 185, 0.3));
@@ -631,159 +777,138 @@ def show_navigation():
                     box-shadow: 0 4px 15px rgba(52, 152, 219, 0.4);
                     flex-shrink: 0;
                 ">
-                    {st.session_state.user["first_name"][0].upper()}
+                    {initial}
                 </div>
                 <div style="flex: 1; min-width: 0;">
-                    <div style="color: white; font-weight: 600; font-size: 0.9rem; white-space: nowrap; overflow: hidden; text-overflow: ellipsis;">{st.session_state.user["first_name"]} {st.session_state.user["last_name"]}</div>
-                    <div style="color: rgba(255,255,255,0.8); font-size: 0.75rem; white-space: nowrap; overflow: hidden; text-overflow: ellipsis;">{st.session_state.user["email"]}</div>
+                    <div style="color: white; font-weight: 600; font-size: 0.9rem; white-space: nowrap; overflow: hidden; text-overflow: ellipsis;">{full_name}</div>
+                    <div style="color: rgba(255,255,255,0.8); font-size: 0.75rem; white-space: nowrap; overflow: hidden; text-overflow: ellipsis;">{email}</div>
                 </div>
             </div>
-            """,
-                unsafe_allow_html=True,
-            )
+            """
 
-            if st.button(
-                "📊  Dashboard Progress",
-                type="primary"
-                if st.session_state.page == "dashboard"
-                else "secondary",
-                use_container_width=True,
-                key="nav_dashboard",
-            ):
-                st.session_state.page = "dashboard"
-                st.rerun()
 
-            if st.button(
-                "📋  Langkah Ekspor Saya",
-                type="primary"
-                if st.session_state.page == "langkah-ekspor"
-                else "secondary",
-                use_container_width=True,
-                key="nav_langkah",
-            ):
-                st.session_state.page = "langkah-ekspor"
-                st.rerun()
+# Navigation runs as button callbacks, which fire before the rerun the click
+# triggers, so the new page renders in that same run without an st.rerun()
+def _go_to(page, trigger_export_readiness=False):
+    """Switch to a page; optionally open chat with the export readiness trigger"""
+    st.session_state.page = page
+    if trigger_export_readiness:
+        st.session_state.trigger_export_readiness = True
 
-            if st.button(
-                "👤  Profil Bisnis",
-                type="primary"
-                if st.session_state.page == "profil-bisnis"
-                else "secondary",
-                use_container_width=True,
-                key="nav_profil",
-            ):
-                st.session_state.page = "profil-bisnis"
-                st.rerun()
 
-            if st.button(
-                "📄  Persiapan Dokumen",
-                type="primary" if st.session_state.page == "dokumen" else "secondary",
-                use_container_width=True,
-                key="nav_dokumen",
-            ):
-                st.session_state.page = "dokumen"
-                st.rerun()
+def _logout():
+    """Log the current user out and reset their session data"""
+    ss = st.session_state
+    # Evict this user's cached dashboard data
+    from .dashboard import get_dashboard_data
+    get_dashboard_data.clear(ss.user["id"])
 
-            if st.button(
-                "⭐  Kualitas Produk Saya",
-                type="primary" if st.session_state.page == "kualitas" else "secondary",
-                use_container_width=True,
-                key="nav_kualitas",
-            ):
-                st.session_state.page = "kualitas"
-                st.rerun()
+    ss.logged_in = False
+    ss.user = None
+    ss.page = "login"
+    reset_user_data()
+    st.toast("Logged out successfully!", icon="👋")
 
-            if st.button(
-                "🌍  Export Readiness Check",
-                type="secondary",
-                use_container_width=True,
-                key="nav_export_check",
-            ):
-                # Set flags and redirect to chat with export readiness trigger
-                st.session_state.page = "chat"
-                st.session_state.trigger_export_readiness = True
-                st.rerun()
 
-            if st.button(
-                "🌐  Cek Pasar Global",
-                type="primary"
-                if st.session_state.page == "pasar-global"
-                else "secondary",
-                use_container_width=True,
-                key="nav_pasar",
-            ):
-                st.session_state.page = "pasar-global"
-                st.rerun()
+def show_navigation():
+    """Display navigation buttons"""
+    ss = st.session_state
+    # Header with navigation
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        st.markdown("### 🚀 Exporo - SME Export Assistant")
 
-            if st.button(
-                "💬  Diskusi dengan Exporo",
-                type="primary" if st.session_state.page == "chat" else "secondary",
-                use_container_width=True,
-                key="nav_chat",
-            ):
-                st.session_state.page = "chat"
-                st.rerun()
+    # Navigation buttons
+    if not ss.logged_in:
+        col1, col2, col3, col4, col5 = st.columns(5)
+        with col2:
+            st.button(
+                "Login",
+                type="secondary" if ss.page != "login" else "primary",
+                on_click=_go_to,
+                args=("login",),
+            )
+        with col4:
+            st.button(
+                "Sign Up",
+                type="secondary" if ss.page != "signup" else "primary",
+                on_click=_go_to,
+                args=("signup",),
+            )
+    else:
+        # Move navigation to sidebar for logged-in users
+        with st.sidebar:
+            # Header with logo
+            st.markdown(_SIDEBAR_HEADER_HTML, unsafe_allow_html=True)
+
+            # User profile and navigation combined to eliminate gaps
+            st.markdown(
+                sidebar_profile_html(
+                    ss.user["first_name"], ss.user["last_name"], ss.user["email"]
+                ),
+                unsafe_allow_html=True,
+            )
+
+            current_page = ss.page
+            for label, key, page, triggers_export_check in SIDEBAR_NAV_ITEMS:
+                is_active = page == current_page and not triggers_export_check
+                st.button(
+                    label,
+                    type="primary" if is_active else "secondary",
+                    use_container_width=True,
+                    key=key,
+                    on_click=_go_to,
+                    args=(page, triggers_export_check),
+                )
 
             st.markdown("<br>", unsafe_allow_html=True)
 
-            if st.button(
+            st.button(
                 "🚪  Logout",
                 type="secondary",
                 use_container_width=True,
                 key="nav_logout",
-            ):
-                st.session_state.logged_in = False
-                st.session_state.user = None
-                st.session_state.page = "login"
-                reset_user_data()
-                st.success("Logged out successfully!")
-                st.rerun()
+                on_click=_logout,
+            )
 
 
-def show_coming_soon_page(feature_key):
-    """Display styled coming soon page with feature-specific colors"""
-    
-    FEATURE_COLORS = {
-        "langkah-ekspor": {
-            "primary": "#3498db", 
-            "secondary": "#2980b9",
-            "icon": "📋", 
-            "title": "Langkah Ekspor Saya",
-            "description": "Panduan langkah demi langkah untuk mempersiapkan ekspor produk Anda ke pasar internasional."
-        },
-        "dokumen": {
-            "primary": "#f39c12", 
-            "secondary": "#e67e22", 
-            "icon": "📄", 
-            "title": "Persiapan Dokumen",
-            "description": "Bantuan lengkap untuk menyiapkan semua dokumen yang diperlukan untuk ekspor."
-        },
-        "kualitas": {
-            "primary": "#9b59b6", 
-            "secondary": "#8e44ad",
-            "icon": "⭐", 
-            "title": "Kualitas Produk Saya",
-            "description": "Analisis dan sertifikasi kualitas produk untuk memenuhi standar internasional."
-        },
-        "pasar-global": {
-            "primary": "#1abc9c", 
-            "secondary": "#16a085",
-            "icon": "🌐", 
-            "title": "Cek Pasar Global",
-            "description": "Riset mendalam tentang peluang pasar dan kompetitor di berbagai negara tujuan ekspor."
-        }
+# Colors and copy for each coming-soon feature page
+COMING_SOON_FEATURES = {
+    "langkah-ekspor": {
+        "primary": "#3498db", 
+        "secondary": "#2980b9",
+        "icon": "📋", 
+        "title": "Langkah Ekspor Saya",
+        "description": "Panduan langkah demi langkah untuk mempersiapkan ekspor produk Anda ke pasar internasional."
+    },
+    "dokumen": {
+        "primary": "#f39c12", 
+        "secondary": "#e67e22", 
+        "icon": "📄", 
+        "title": "Persiapan Dokumen",
+        "description": "Bantuan lengkap untuk menyiapkan semua dokumen yang diperlukan untuk ekspor."
+    },
+    "kualitas": {
+        "primary": "#9b59b6", 
+        "secondary": "#8e44ad",
+        "icon": "⭐", 
+        "title": "Kualitas Produk Saya",
+        "description": "Analisis dan sertifikasi kualitas produk untuk memenuhi standar internasional."
+    },
+    "pasar-global": {
+        "primary": "#1abc9c", 
+        "secondary": "#16a085",
+        "icon": "🌐", 
+        "title": "Cek Pasar Global",
+        "description": "Riset mendalam tentang peluang pasar dan kompetitor di berbagai negara tujuan ekspor."
     }
-    
-    if feature_key not in FEATURE_COLORS:
-        feature_key = "langkah-ekspor"  # Default fallback
-    
-    colors = FEATURE_COLORS[feature_key]
-    
-    # Styled coming soon page with gradient background
-    st.markdown(
-        f"""
+}
+
+
+# Gradient coming-soon card, filled from a COMING_SOON_FEATURES entry
+_COMING_SOON_TEMPLATE = """
     <div style="
-        background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']});
+        background: linear-gradient(135deg, {primary}, {secondary});
         color: white;
         padding: 4rem 2rem;
         border-radius: 25px;
@@ -792,11 +917,11 @@ def show_coming_soon_page(feature_key):
         box-shadow: 0 10px 40px rgba(0,0,0,0.2);
         border: 1px solid rgba(255,255,255,0.3);
     ">
-        <div style="font-size: 5rem; margin-bottom: 1.5rem; text-shadow: 0 4px 8px rgba(0,0,0,0.3);">{colors['icon']}</div>
-        <h1 style="margin: 0 0 1rem 0; font-size: 2.5rem; text-shadow: 0 2px 4px rgba(0,0,0,0.3);">{colors['title']}</h1>
+        <div style="font-size: 5rem; margin-bottom: 1.5rem; text-shadow: 0 4px 8px rgba(0,0,0,0.3);">{icon}</div>
+        <h1 style="margin: 0 0 1rem 0; font-size: 2.5rem; text-shadow: 0 2px 4px rgba(0,0,0,0.3);">{title}</h1>
         <h2 style="margin: 0 0 1.5rem 0; font-size: 1.8rem; font-weight: 300; color: rgba(255,255,255,0.9);">Coming Soon! 🚀</h2>
         <p style="font-size: 1.1rem; line-height: 1.6; margin: 0 0 2rem 0; color: rgba(255,255,255,0.95); max-width: 600px; margin-left: auto; margin-right: auto;">
-            {colors['description']}
+            {description}
         </p>
         <div style="
             background: rgba(255,255,255,0.1);
@@ -813,9 +938,23 @@ def show_coming_soon_page(feature_key):
             </p>
         </div>
     </div>
-    """,
-        unsafe_allow_html=True,
-    )
+    """
+
+# The features are static, so each page's HTML is rendered once at import
+_COMING_SOON_HTML = {
+    key: _COMING_SOON_TEMPLATE.format_map(feature)
+    for key, feature in COMING_SOON_FEATURES.items()
+}
+
+
+def show_coming_soon_page(feature_key):
+    """Display styled coming soon page with feature-specific colors"""
+    
+    if feature_key not in COMING_SOON_FEATURES:
+        feature_key = "langkah-ekspor"  # Default fallback
+    
+    # Styled coming soon page with gradient background
+    st.markdown(_COMING_SOON_HTML[feature_key], unsafe_allow_html=True)
     
     # Call to action section
     col1, col2, col3 = st.columns([1, 2, 1])
@@ -825,11 +964,170 @@ def show_coming_soon_page(feature_key):
             st.rerun()
 
 
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
+def build_assessment_history_frame(assessment_history):
+    """Build the assessment history table shown on the business profile page"""
+    # pandas is only needed here, so keep it off the login/signup import path
+    import pandas as pd
+
+    # Build typed columns directly so scores and dates are not held as Python objects
+    return pd.DataFrame({
+        "Negara": [a.get('country', 'N/A') for a in assessment_history],
+        "Skor": pd.to_numeric(
+            pd.Series([a.get('score') for a in assessment_history], dtype=object),
+            errors="coerce",
+            downcast="float",
+        ),
+        "Status": pd.Categorical([a.get('status', 'N/A') for a in assessment_history]),
+        "Tanggal": pd.to_datetime(
+            [a.get('timestamp') for a in assessment_history],
+            errors="coerce",
+            utc=True,
+            format="ISO8601",
+        ),
+    })
+
+
+def _profile_field(label, value) -> str:
+    """One bold-labelled profile value, HTML-escaped"""
+    return f"<p><strong>{label}:</strong> {html.escape(str(value))}</p>"
+
+
+def _profile_section(title, left, right) -> str:
+    """A titled profile section with two columns of fields"""
+    return (
+        f"<h3>{title}</h3>"
+        f'<div class="profile-section"><div>{"".join(left)}</div>'
+        f'<div>{"".join(right)}</div></div>'
+    )
+
+
+def business_profile_html(memory_data: dict) -> str:
+    """Render the business profile's field sections as a single HTML block"""
+    location = memory_data.get("production_location", {})
+    product_details = memory_data.get("product_details", {})
+    sections = [
+        _profile_section(
+            "🏢 Informasi Perusahaan",
+            (
+                _profile_field("Nama Perusahaan", memory_data.get("company_name", "Belum diisi")),
+                _profile_field("Latar Belakang Bisnis", memory_data.get("business_background", "Belum diisi")),
+            ),
+            (
+                _profile_field(
+                    "Lokasi Produksi",
+                    f"{location.get('city', 'Belum diisi')}, {location.get('province', 'Belum diisi')}",
+                ),
+                _profile_field("Bahasa Komunikasi", memory_data.get("conversation_language", "Indonesian")),
+            ),
+        ),
+        _profile_section(
+            "📦 Detail Produk",
+            (
+                _profile_field("Nama Produk", product_details.get("name", "Belum diisi")),
+                _profile_field("Kategori Produk", memory_data.get("product_category", "Belum diisi")),
+            ),
+            (
+                _profile_field("Deskripsi", product_details.get("description", "Belum diisi")),
+                _profile_field("Keunggulan Unik", product_details.get("unique_features", "Belum diisi")),
+            ),
+        ),
+    ]
+
+    # Production Information Section
+    capacity = memory_data.get("production_capacity", {})
+    amount = capacity.get("amount", 0)
+    unit = capacity.get("unit", "unit")
+    timeframe = capacity.get("timeframe", "bulan")
+    
+    # Convert amount to int/float for comparison
+    try:
+        amount_num = float(amount) if amount else 0
+    except (ValueError, TypeError):
+        amount_num = 0
+    
+    capacity_text = f"{amount} {unit} per {timeframe}" if amount_num > 0 else "Belum diisi"
+    sections.append(
+        "<h3>🏭 Informasi Produksi</h3>"
+        + _profile_field("Kapasitas Produksi", capacity_text)
+    )
+
+    # Export Readiness Section (if available)
+    export_readiness = memory_data.get("export_readiness", {})
+    if export_readiness and any(v for v in export_readiness.values() if v not in ["Not specified", [], ""]):
+        left, right = [], []
+        target_countries = export_readiness.get("target_countries", [])
+        if target_countries:
+            left.append(_profile_field("Negara Target", ", ".join(target_countries)))
+        experience = export_readiness.get("export_experience", "Belum diisi")
+        if experience != "Not specified":
+            left.append(_profile_field("Pengalaman Ekspor", experience))
+        goals = export_readiness.get("export_goals", "Belum diisi")
+        if goals != "Not specified":
+            right.append(_profile_field("Tujuan Ekspor", goals))
+        budget = export_readiness.get("budget_for_export", "Belum diisi")
+        if budget != "Not specified":
+            right.append(_profile_field("Budget Ekspor", budget))
+        sections.append(_profile_section("🌍 Kesiapan Ekspor", left, right))
+
+    return "<hr>".join(sections)
+
+
+def _set_assessment_page(page):
+    """Pager callback; runs before the fragment rerun the click triggers"""
+    st.session_state.assessment_page = page
+
+
+@st.fragment
+def _assessment_history_table(assessment_history):
+    """Paged assessment history table; paging reruns only this fragment"""
+    # Only send one page of history to the frontend at a time
+    page_count = -(-len(assessment_history) // ASSESSMENT_PAGE_SIZE)
+    page = min(st.session_state.get("assessment_page", 0), page_count - 1)
+    start = page * ASSESSMENT_PAGE_SIZE
+    visible = assessment_history[start:start + ASSESSMENT_PAGE_SIZE]
+
+    st.dataframe(
+        build_assessment_history_frame(visible),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Skor": st.column_config.ProgressColumn(
+                "Skor", min_value=0, max_value=100, format="%d/100"
+            ),
+            "Tanggal": st.column_config.DatetimeColumn(
+                "Tanggal", format="DD/MM/YYYY"
+            ),
+        },
+    )
+
+    if page_count > 1:
+        col_prev, col_info, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            st.button(
+                "◀ Sebelumnya",
+                disabled=page == 0,
+                key="assessment_prev",
+                on_click=_set_assessment_page,
+                args=(page - 1,),
+            )
+        with col_info:
+            st.caption(f"Halaman {page + 1} dari {page_count}")
+        with col_next:
+            st.button(
+                "Berikutnya ▶",
+                disabled=page >= page_count - 1,
+                key="assessment_next",
+                on_click=_set_assessment_page,
+                args=(page + 1,),
+            )
+
+
 def show_business_profile_page():
     """Display user's actual business profile from Memory Bot data"""
     
     # Get Memory Bot data
-    memory_data = st.session_state.get("memory_bot", DEFAULT_EXTRACTED_DATA)
+    memory_data = st.session_state.get("memory_bot") or make_default_extracted_data()
     
     # Red theme header matching the button
     st.markdown(
@@ -854,90 +1152,8 @@ def show_business_profile_page():
         unsafe_allow_html=True,
     )
     
-    # Company Information Section
-    st.markdown("### 🏢 Informasi Perusahaan")
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        company_name = memory_data.get("company_name", "Belum diisi")
-        st.markdown(f"**Nama Perusahaan:** {company_name}")
-        
-        business_bg = memory_data.get("business_background", "Belum diisi")
-        st.markdown(f"**Latar Belakang Bisnis:** {business_bg}")
-    
-    with col2:
-        location = memory_data.get("production_location", {})
-        city = location.get("city", "Belum diisi")
-        province = location.get("province", "Belum diisi")
-        st.markdown(f"**Lokasi Produksi:** {city}, {province}")
-        
-        language = memory_data.get("conversation_language", "Indonesian")
-        st.markdown(f"**Bahasa Komunikasi:** {language}")
-    
-    st.markdown("---")
-    
-    # Product Details Section
-    st.markdown("### 📦 Detail Produk")
-    product_details = memory_data.get("product_details", {})
-    
-    col1, col2 = st.columns(2)
-    with col1:
-        product_name = product_details.get("name", "Belum diisi")
-        st.markdown(f"**Nama Produk:** {product_name}")
-        
-        category = memory_data.get("product_category", "Belum diisi")
-        st.markdown(f"**Kategori Produk:** {category}")
-    
-    with col2:
-        description = product_details.get("description", "Belum diisi")
-        st.markdown(f"**Deskripsi:** {description}")
-        
-        features = product_details.get("unique_features", "Belum diisi")
-        st.markdown(f"**Keunggulan Unik:** {features}")
-    
-    st.markdown("---")
-    
-    # Production Information Section
-    st.markdown("### 🏭 Informasi Produksi")
-    capacity = memory_data.get("production_capacity", {})
-    
-    amount = capacity.get("amount", 0)
-    unit = capacity.get("unit", "unit")
-    timeframe = capacity.get("timeframe", "bulan")
-    
-    # Convert amount to int/float for comparison
-    try:
-        amount_num = float(amount) if amount else 0
-    except (ValueError, TypeError):
-        amount_num = 0
-    
-    capacity_text = f"{amount} {unit} per {timeframe}" if amount_num > 0 else "Belum diisi"
-    st.markdown(f"**Kapasitas Produksi:** {capacity_text}")
-    
-    # Export Readiness Section (if available)
-    export_readiness = memory_data.get("export_readiness", {})
-    if export_readiness and any(v for v in export_readiness.values() if v not in ["Not specified", [], ""]):
-        st.markdown("---")
-        st.markdown("### 🌍 Kesiapan Ekspor")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            target_countries = export_readiness.get("target_countries", [])
-            if target_countries:
-                st.markdown(f"**Negara Target:** {', '.join(target_countries)}")
-            
-            experience = export_readiness.get("export_experience", "Belum diisi")
-            if experience != "Not specified":
-                st.markdown(f"**Pengalaman Ekspor:** {experience}")
-        
-        with col2:
-            goals = export_readiness.get("export_goals", "Belum diisi")
-            if goals != "Not specified":
-                st.markdown(f"**Tujuan Ekspor:** {goals}")
-            
-            budget = export_readiness.get("budget_for_export", "Belum diisi")
-            if budget != "Not specified":
-                st.markdown(f"**Budget Ekspor:** {budget}")
+    # Company, product, production and export sections as one element
+    st.markdown(business_profile_html(memory_data), unsafe_allow_html=True)
     
     # Assessment History Section (if available)
     assessment_history = memory_data.get("assessment_history", [])
@@ -945,23 +1161,7 @@ def show_business_profile_page():
         st.markdown("---")
         st.markdown("### 📊 Riwayat Analisis Kesiapan Ekspor")
         
-        for i, assessment in enumerate(assessment_history, 1):
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.markdown(f"**{i}. Negara:** {assessment.get('country', 'N/A')}")
-            with col2:
-                st.markdown(f"**Skor:** {assessment.get('score', 'N/A')}/100")
-            with col3:
-                st.markdown(f"**Status:** {assessment.get('status', 'N/A')}")
-            with col4:
-                timestamp = assessment.get('timestamp', '')
-                if timestamp:
-                    try:
-                        date_obj = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                        formatted_date = date_obj.strftime('%d/%m/%Y')
-                        st.markdown(f"**Tanggal:** {formatted_date}")
-                    except:
-                        st.markdown(f"**Tanggal:** {timestamp[:10]}")
+        _assessment_history_table(assessment_history)
     
     st.markdown("---")
     
@@ -986,6 +1186,39 @@ def show_business_profile_page():
             )
 
 
+# Welcome page feature cards as (icon, title, description)
+WELCOME_FEATURES = (
+    ("💬", "Chat dengan AI", "Berbincang natural dalam Bahasa Indonesia untuk mengumpulkan profil bisnis Anda"),
+    ("🧠", "Memory Bot", "AI yang mengingat dan mengorganisir informasi bisnis Anda secara otomatis"),
+    ("📊", "Export Profil", "Download profil bisnis lengkap dalam format JSON untuk keperluan ekspor"),
+)
+
+# Feature card HTML, rendered once at import
+WELCOME_FEATURE_CARDS = tuple(
+    f"""
+        <div style="
+            background: linear-gradient(145deg, #ffffff, #f8f9fb);
+            padding: 2rem;
+            border-radius: 20px;
+            text-align: center;
+            box-shadow: 0 8px 25px rgba(0,0,0,0.1);
+            border: 1px solid rgba(0,0,0,0.05);
+            height: 280px;
+            display: flex;
+            flex-direction: column;
+            justify-content: center;
+        ">
+            <div style="font-size: 3rem; margin-bottom: 1rem;">{icon}</div>
+            <h3 style="color: #2c3e50; margin-bottom: 1rem;">{title}</h3>
+            <p style="color: #7f8c8d; line-height: 1.5;">
+                {description}
+            </p>
+        </div>
+        """
+    for icon, title, description in WELCOME_FEATURES
+)
+
+
 def show_welcome_landing_page():
     """Display the welcome/landing page after login"""
     user_name = st.session_state.user["first_name"]
@@ -1018,82 +1251,9 @@ def show_welcome_landing_page():
     )
 
     # Features section
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        st.markdown(
-            """
-        <div style="
-            background: linear-gradient(145deg, #ffffff, #f8f9fb);
-            padding: 2rem;
-            border-radius: 20px;
-            text-align: center;
-            box-shadow: 0 8px 25px rgba(0,0,0,0.1);
-            border: 1px solid rgba(0,0,0,0.05);
-            height: 280px;
-            display: flex;
-            flex-direction: column;
-            justify-content: center;
-        ">
-            <div style="font-size: 3rem; margin-bottom: 1rem;">💬</div>
-            <h3 style="color: #2c3e50; margin-bottom: 1rem;">Chat dengan AI</h3>
-            <p style="color: #7f8c8d; line-height: 1.5;">
-                Berbincang natural dalam Bahasa Indonesia untuk mengumpulkan profil bisnis Anda
-            </p>
-        </div>
-        """,
-            unsafe_allow_html=True,
-        )
-
-    with col2:
-        st.markdown(
-            """
-        <div style="
-            background: linear-gradient(145deg, #ffffff, #f8f9fb);
-            padding: 2rem;
-            border-radius: 20px;
-            text-align: center;
-            box-shadow: 0 8px 25px rgba(0,0,0,0.1);
-            border: 1px solid rgba(0,0,0,0.05);
-            height: 280px;
-            display: flex;
-            flex-direction: column;
-            justify-content: center;
-        ">
-            <div style="font-size: 3rem; margin-bottom: 1rem;">🧠</div>
-            <h3 style="color: #2c3e50; margin-bottom: 1rem;">Memory Bot</h3>
-            <p style="color: #7f8c8d; line-height: 1.5;">
-                AI yang mengingat dan mengorganisir informasi bisnis Anda secara otomatis
-            </p>
-        </div>
-        """,
-            unsafe_allow_html=True,
-        )
-
-    with col3:
-        st.markdown(
-            """
-        <div style="
-            background: linear-gradient(145deg, #ffffff, #f8f9fb);
-            padding: 2rem;
-            border-radius: 20px;
-            text-align: center;
-            box-shadow: 0 8px 25px rgba(0,0,0,0.1);
-            border: 1px solid rgba(0,0,0,0.05);
-            height: 280px;
-            display: flex;
-            flex-direction: column;
-            justify-content: center;
-        ">
-            <div style="font-size: 3rem; margin-bottom: 1rem;">📊</div>
-            <h3 style="color: #2c3e50; margin-bottom: 1rem;">Export Profil</h3>
-            <p style="color: #7f8c8d; line-height: 1.5;">
-                Download profil bisnis lengkap dalam format JSON untuk keperluan ekspor
-            </p>
-        </div>
-        """,
-            unsafe_allow_html=True,
-        )
+    for col, card_html in zip(st.columns(3), WELCOME_FEATURE_CARDS):
+        with col:
+            st.markdown(card_html, unsafe_allow_html=True)
 
     # Call to action
     st.markdown("<br><br>", unsafe_allow_html=True)
@@ -7,38 +7,325 @@ import streamlit as st
 import json
 from datetime import datetime
 import uuid
-import base64
 import io
-import asyncio
+import base64
+import functools
 import concurrent.futures
 import threading
 import time
+import random
+import re
+from types import MappingProxyType
 from google import genai
-from google.genai import types
+from google.genai import errors, types
+from pydantic import BaseModel
 from .config import (
-    GEMINI_API_KEY,
+    DEBUG,
+    gemini_api_key,
     USER_PROFILING_PROMPT,
-    EXPORT_FOCUSED_PROMPT,
     DATA_EXTRACTION_PROMPT,
     EXPORT_DATA_EXTRACTION_PROMPT,
     EXPORT_READINESS_PROMPT,
+    HISTORY_SUMMARY_PROMPT,
     DEFAULT_EXTRACTED_DATA,
+    make_default_extracted_data,
+    now_iso,
+    format_export_focused_prompt,
+)
+from .history import archive_old_messages, discard_history, load_image, store_image
+from .schemas import ExportExtraction, ProfileExtraction
+
+
+# Keywords that mark a conversation as export-related (lowercase)
+EXPORT_KEYWORDS = (
+    "export",
+    "ekspor",
+    "international",
+    "negara",
+    "country",
+    "market",
+    "pasar",
+    "certification",
+    "sertifikasi",
+    "readiness",
+)
+
+# Country mapping for difficulty and market size
+COUNTRY_MARKET_INFO = MappingProxyType({
+    "Amerika Serikat": {"difficulty": "High", "market_size": "Large"},
+    "US": {"difficulty": "High", "market_size": "Large"},
+    "Uni Eropa": {"difficulty": "High", "market_size": "Large"},
+    "EU": {"difficulty": "High", "market_size": "Large"},
+    "Jepang": {"difficulty": "High", "market_size": "Large"},
+    "Japan": {"difficulty": "High", "market_size": "Large"},
+    "Singapura": {"difficulty": "Medium", "market_size": "Medium"},
+    "Singapore": {"difficulty": "Medium", "market_size": "Medium"},
+    "Malaysia": {"difficulty": "Low", "market_size": "Medium"},
+    "Australia": {"difficulty": "Medium", "market_size": "Large"},
+    "Korea Selatan": {"difficulty": "Medium", "market_size": "Large"},
+    "South Korea": {"difficulty": "Medium", "market_size": "Large"},
+    "China": {"difficulty": "High", "market_size": "Very Large"},
+    "Cina": {"difficulty": "High", "market_size": "Very Large"},
+})
+
+# Keywords that trigger export analysis
+ANALYSIS_TRIGGERS = (
+    "cek kesiapan ekspor",
+    "analisis ekspor",
+    "export readiness",
+    "siap ekspor",
+    "kesiapan ekspor",
+    "analisis kesiapan",
 )
 
+# Country keywords mapped to the canonical country name
+COUNTRY_KEYWORDS = MappingProxyType({
+    "amerika": "Amerika Serikat",
+    "us": "Amerika Serikat",
+    "usa": "Amerika Serikat",
+    "eropa": "Uni Eropa",
+    "eu": "Uni Eropa",
+    "europe": "Uni Eropa",
+    "jepang": "Jepang",
+    "japan": "Jepang",
+    "singapura": "Singapura",
+    "singapore": "Singapura",
+    "malaysia": "Malaysia",
+    "australia": "Australia",
+    "korea": "Korea Selatan",
+    "south korea": "Korea Selatan",
+    "china": "China",
+    "cina": "China",
+})
+
+
+# Process-wide Gemini client, created on first use (a missing key must not
+# break importing this module)
+_GEMINI_CLIENT = None
+_gemini_client_lock = threading.Lock()
+
 
-# Initialize Gemini client
-@st.cache_resource
 def init_gemini():
-    """Initialize and cache Gemini client"""
-    if not GEMINI_API_KEY or GEMINI_API_KEY == "your_gemini_api_key_here":
-        raise ValueError(
-            "GEMINI_API_KEY not configured. Please set it in your environment variables or .env file."
+    """Return the shared Gemini client, creating it on first call"""
+    global _GEMINI_CLIENT
+    if _GEMINI_CLIENT is not None:
+        return _GEMINI_CLIENT
+    with _gemini_client_lock:
+        if _GEMINI_CLIENT is None:
+            api_key = gemini_api_key()
+            if not api_key or api_key == "your_gemini_api_key_here":
+                raise ValueError(
+                    "GEMINI_API_KEY not configured. Please set it in .streamlit/secrets.toml, your environment variables or .env file."
+                )
+            _GEMINI_CLIENT = genai.Client(api_key=api_key)
+    return _GEMINI_CLIENT
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _probe_gemini() -> str:
+    """Check the key with one real model lookup; cached process-wide for 10 min"""
+    try:
+        init_gemini().models.get(model="gemini-2.5-flash")
+    except ValueError as e:
+        return f"err:{e}"
+    except errors.APIError as e:
+        if _is_retryable(e):
+            # Transient; raising keeps it out of the cache
+            raise
+        return f"err:{e.message or e}"
+    return "ok"
+
+
+def gemini_status() -> str:
+    """Return "ok" or "err:<reason>" for the Gemini setup, probed once per session"""
+    if "gemini_status" not in st.session_state:
+        try:
+            st.session_state.gemini_status = _probe_gemini()
+        except Exception:
+            # Could not tell (network/rate limit); assume usable for this
+            # session rather than re-probing on every rerun
+            st.session_state.gemini_status = "ok"
+    return st.session_state.gemini_status
+
+
+# Gemini calls allowed in flight at once across all sessions on this server.
+# Background work (extraction, history summary) has its own smaller pool so
+# a user-facing reply stream never queues behind another session's extraction
+_GEMINI_SEMAPHORE = threading.BoundedSemaphore(4)
+_BACKGROUND_GEMINI_SEMAPHORE = threading.BoundedSemaphore(2)
+_GEMINI_MAX_ATTEMPTS = 3
+
+
+def _is_retryable(error: errors.APIError) -> bool:
+    """Return True for rate-limit (429) and server-side (5xx) Gemini errors"""
+    return isinstance(error, errors.ServerError) or error.code == 429
+
+
+def _backoff(attempt: int):
+    """Sleep with exponential backoff plus jitter before the next attempt"""
+    time.sleep(2**attempt + random.random())
+
+
+def generate_with_retry(client, background: bool = False, **kwargs):
+    """Call generate_content with bounded concurrency, retrying 429/5xx with backoff"""
+    semaphore = _BACKGROUND_GEMINI_SEMAPHORE if background else _GEMINI_SEMAPHORE
+    for attempt in range(_GEMINI_MAX_ATTEMPTS):
+        try:
+            with semaphore:
+                return client.models.generate_content(**kwargs)
+        except errors.APIError as e:
+            if attempt == _GEMINI_MAX_ATTEMPTS - 1 or not _is_retryable(e):
+                raise
+            _backoff(attempt)
+
+
+def stream_with_retry(client, **kwargs):
+    """Stream generate_content chunks, retrying 429/5xx until the first chunk arrives"""
+    for attempt in range(_GEMINI_MAX_ATTEMPTS):
+        started = False
+        try:
+            with _GEMINI_SEMAPHORE:
+                for chunk in client.models.generate_content_stream(**kwargs):
+                    started = True
+                    yield chunk
+            return
+        except errors.APIError as e:
+            if started or attempt == _GEMINI_MAX_ATTEMPTS - 1 or not _is_retryable(e):
+                raise
+            _backoff(attempt)
+
+
+# Long-edge pixel bound for chat images sent to Gemini
+MAX_IMAGE_SIDE = 1024
+
+
+def shrink_image(uploaded_file) -> tuple[bytes, str]:
+    """Downscale an uploaded image to MAX_IMAGE_SIDE and re-encode it as JPEG"""
+    from PIL import Image
+
+    try:
+        image = Image.open(uploaded_file)
+        image.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format="JPEG", quality=85)
+        return buffer.getvalue(), "image/jpeg"
+    except Exception as e:
+        print(f"Image resize failed, using original: {e}")
+        uploaded_file.seek(0)
+        return uploaded_file.read(), uploaded_file.type
+
+
+# Long-edge pixel bound for chat thumbnails (shown at 300px, 2x for HiDPI)
+THUMBNAIL_SIDE = 600
+
+
+def thumbnail_data_uri(image_bytes: bytes) -> str | None:
+    """Encode a small JPEG thumbnail as a data URI once, at upload time"""
+    from PIL import Image
+
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        image.thumbnail((THUMBNAIL_SIDE, THUMBNAIL_SIDE))
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format="JPEG", quality=80)
+    except Exception as e:
+        print(f"Thumbnail failed, will inline the stored image: {e}")
+        return None
+    encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return f"data:image/jpeg;base64,{encoded}"
+
+
+def upload_image(image_bytes: bytes, mime_type: str):
+    """Upload an image once via the Gemini Files API and return its URI (None on failure)"""
+    try:
+        client = init_gemini()
+        file_ref = client.files.upload(
+            file=io.BytesIO(image_bytes),
+            config=types.UploadFileConfig(mime_type=mime_type),
         )
-    return genai.Client(api_key=GEMINI_API_KEY)
+        return file_ref.uri
+    except Exception as e:
+        print(f"Image upload failed, will send inline: {e}")
+        return None
+
+
+def image_part(image: dict) -> types.Part:
+    """Build a Gemini part for a stored chat image, preferring its uploaded URI"""
+    if image.get("uri"):
+        return types.Part.from_uri(file_uri=image["uri"], mime_type=image["mime_type"])
+    return types.Part.from_bytes(
+        data=load_image(image["path"]), mime_type=image["mime_type"]
+    )
+
+
+# Sliding window of conversation history sent to Gemini per turn
+HISTORY_WINDOW = 12
+MAX_MESSAGE_CHARS = 2000
+
+
+def history_window(conversation_history: list) -> list:
+    """Keep the last HISTORY_WINDOW messages plus any earlier messages carrying images"""
+    cutoff = len(conversation_history) - HISTORY_WINDOW
+    return [
+        msg
+        for i, msg in enumerate(conversation_history)
+        if i >= cutoff or msg.get("images")
+    ]
+
+
+# Messages older than the window are folded into a rolling summary in batches
+SUMMARY_BATCH = 8
+
+
+def pending_summary_messages(messages: list) -> list:
+    """Messages that fell out of the history window and are not yet summarized"""
+    return [
+        msg for msg in messages[:-HISTORY_WINDOW] if not msg.get("summarized")
+    ]
+
+
+def summarize_history(summary: str, messages: list) -> str | None:
+    """Fold messages into the rolling conversation summary (None on failure)"""
+    try:
+        prompt = HISTORY_SUMMARY_PROMPT.format(
+            summary=summary or "-",
+            messages=_conversation_text(messages, len(messages)),
+        )
+        response = generate_with_retry(
+            init_gemini(),
+            background=True,
+            model="gemini-2.5-flash",
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                max_output_tokens=1000, temperature=0.2
+            ),
+        )
+        return (response.text or "").strip() or None
+    except Exception as e:
+        print(f"History summary error: {e}")
+        return None
 
 
-def get_bot_response(user_input, conversation_history, uploaded_images=None):
-    """Get bot response using Gemini API with intelligent prompt selection"""
+def truncate_message(text: str) -> str:
+    """Cap a single history message at MAX_MESSAGE_CHARS"""
+    if len(text) <= MAX_MESSAGE_CHARS:
+        return text
+    return text[:MAX_MESSAGE_CHARS] + "…"
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def chat_generate_config(system_prompt: str) -> types.GenerateContentConfig:
+    """Build the chat GenerateContentConfig once per distinct system prompt"""
+    return types.GenerateContentConfig(
+        system_instruction=system_prompt,
+        response_mime_type="text/plain",
+        max_output_tokens=4000,
+        temperature=0.7,
+    )
+
+
+def get_bot_response(user_input, conversation_history, uploaded_images: list[dict] | None = None):
+    """Stream the bot response as text chunks using Gemini with intelligent prompt selection"""
 
     # Get memory data and check profile completeness
     memory_data = st.session_state.get("memory_bot", DEFAULT_EXTRACTED_DATA)
@@ -51,11 +338,12 @@ def get_bot_response(user_input, conversation_history, uploaded_images=None):
 
     # If export analysis is requested and we have a target country, perform analysis
     if analysis_requested and target_country:
-        return perform_chat_based_export_analysis(target_country, memory_data)
+        yield perform_chat_based_export_analysis(target_country, memory_data)
+        return
 
     # If analysis requested but no country, ask for country specification
     if analysis_requested and not target_country:
-        return """
+        yield """
 🤔 **Saya siap melakukan analisis kesiapan ekspor untuk Anda!**
 
 Namun, saya perlu tahu negara tujuan ekspor yang Anda inginkan. Berikut beberapa pilihan:
@@ -77,6 +365,7 @@ Namun, saya perlu tahu negara tujuan ekspor yang Anda inginkan. Berikut beberapa
 
 Negara mana yang ingin Anda analisis?
         """
+        return
 
     # Select appropriate prompt based on profile completeness
     if profile_status["is_complete"]:
@@ -93,12 +382,12 @@ Negara mana yang ingin Anda analisis?
         location = memory_data.get("production_location", {})
         location_str = f"{location.get('city', '')}, {location.get('province', '')}"
 
-        system_prompt = EXPORT_FOCUSED_PROMPT.format(
-            company_name=company_name,
-            product_name=product_name,
-            product_category=product_category,
-            production_capacity=capacity_str,
-            production_location=location_str
+        system_prompt = format_export_focused_prompt(
+            str(company_name),
+            str(product_name),
+            str(product_category),
+            capacity_str,
+            location_str,
         )
     else:
         # Use profile building prompt
@@ -107,136 +396,157 @@ Negara mana yang ingin Anda analisis?
     # Normal chat flow
     client = init_gemini()
 
-    # Prepare conversation content for Gemini
-    contents = []
-
-    # Add system prompt as first user message
-    contents.append(
+    # Prepare conversation content for Gemini from the recent window plus
+    # earlier image turns; the system prompt goes in system_instruction
+    # rather than as fake opening turns. Empty text parts are skipped for
+    # image-only messages.
+    contents = [
         types.Content(
-            role="user", parts=[types.Part.from_text(text=system_prompt)]
+            role="model" if msg["role"] == "assistant" else "user",
+            parts=(
+                [types.Part.from_text(text=truncate_message(msg["content"]))]
+                if msg.get("content")
+                else []
+            )
+            + [image_part(image) for image in msg.get("images") or ()],
         )
-    )
-
-    # Add a model response acknowledging the system prompt based on mode
-    if profile_status["is_complete"]:
-        acknowledgment_text = f"Saya Exporo, siap membantu sebagai Export Specialist untuk {memory_data.get('company_name', 'perusahaan Anda')}. Profil bisnis Anda sudah lengkap dan saya akan fokus pada strategi ekspor dan analisis kesiapan pasar internasional."
-    else:
-        acknowledgment_text = "Saya Exporo, siap membantu sebagai Business Profile Assistant untuk UKM Indonesia. Saya akan mengumpulkan informasi bisnis secara bertahap dan ramah serta membantu analisis kesiapan ekspor."
+        for msg in history_window(conversation_history)
+    ]
 
-    contents.append(
-        types.Content(
-            role="model",
-            parts=[
-                types.Part.from_text(text=acknowledgment_text)
-            ],
+    # Older context travels as the rolling summary instead of full turns
+    rolling_summary = st.session_state.get("rolling_summary")
+    if rolling_summary:
+        contents.insert(
+            0,
+            types.Content(
+                role="user",
+                parts=[
+                    types.Part.from_text(
+                        text=f"Ringkasan percakapan sebelumnya:\n{rolling_summary}"
+                    )
+                ],
+            ),
         )
-    )
-
-    # Add conversation history
-    for msg in conversation_history:
-        role = "model" if msg["role"] == "assistant" else "user"
-        parts = [types.Part.from_text(text=msg["content"])]
-
-        # Add images if present in message
-        if "images" in msg and msg["images"]:
-            for img_bytes in msg["images"]:
-                parts.append(
-                    types.Part.from_bytes(data=img_bytes, mime_type="image/jpeg")
-                )
-
-        contents.append(types.Content(role=role, parts=parts))
 
     # Add current user input
     parts = [types.Part.from_text(text=user_input)]
 
-    # Add uploaded images if present
-    if uploaded_images:
-        for uploaded_image in uploaded_images:
-            # Convert PIL Image to bytes
-            img_byte_arr = io.BytesIO()
-            uploaded_image.save(img_byte_arr, format="JPEG")
-            img_byte_arr = img_byte_arr.getvalue()
-
-            parts.append(
-                types.Part.from_bytes(data=img_byte_arr, mime_type="image/jpeg")
-            )
+    # Add this turn's images (stored image dicts), passed through as uploaded
+    parts.extend(image_part(image) for image in uploaded_images or ())
 
     contents.append(types.Content(role="user", parts=parts))
 
     try:
-        generate_config = types.GenerateContentConfig(
-            response_mime_type="text/plain", max_output_tokens=4000, temperature=0.7
-        )
+        generate_config = chat_generate_config(system_prompt)
 
-        response = client.models.generate_content(
-            model="gemini-2.5-flash", contents=contents, config=generate_config
+        stream = stream_with_retry(
+            client, model="gemini-2.5-flash", contents=contents, config=generate_config
         )
-        return response.text
+        for chunk in stream:
+            if chunk.text:
+                yield chunk.text
     except Exception as e:
-        return f"Error: {str(e)}"
+        yield f"Error: {str(e)}"
 
 
-def extract_data_from_conversation(conversation_history):
-    """Extract structured data using Gemini API with data extraction prompt from latest and previous chat"""
-    client = init_gemini()
+def _conversation_text(conversation_history, window: int) -> str:
+    """Render the last `window` messages as role-prefixed plain text, skipping image-only ones"""
+    return "\n".join(
+        f"{msg['role']}: {msg['content']}"
+        for msg in conversation_history[-window:]
+        if msg.get("content")
+    )
 
-    # Use the latest 4 messages to capture both latest and previous chat context
-    latest_messages = (
-        conversation_history[-4:]
-        if len(conversation_history) >= 4
-        else conversation_history
+
+def strip_json_fence(text: str | None) -> str:
+    """Strip surrounding whitespace and a ```json / ``` markdown fence from model output"""
+    return (
+        (text or "").strip()
+        .removeprefix("```json")
+        .removeprefix("```")
+        .removesuffix("```")
+        .strip()
     )
 
-    # Prepare conversation text
-    conversation_text = "\n".join(
-        [f"{msg['role']}: {msg.get('content', '')}" for msg in latest_messages]
+
+@functools.lru_cache(maxsize=4)
+def _extraction_config(schema: type[BaseModel]) -> types.GenerateContentConfig:
+    """Build the structured-output config for an extraction schema once"""
+    return types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=schema,
+        thinking_config=types.ThinkingConfig(thinking_budget=-1),
+        max_output_tokens=4000,
+        temperature=0.1,
     )
 
-    # Prepare contents for Gemini
+
+@functools.lru_cache(maxsize=8)
+def _extraction_prefix(prompt: str, acknowledgement: str | None) -> tuple:
+    """Build the static prompt (+ acknowledgement) turns for an extraction prompt once"""
+    prefix = [types.Content(role="user", parts=[types.Part.from_text(text=prompt)])]
+    if acknowledgement:
+        prefix.append(
+            types.Content(
+                role="model", parts=[types.Part.from_text(text=acknowledgement)]
+            )
+        )
+    return tuple(prefix)
+
+
+def _run_extraction(
+    prompt: str,
+    request_text: str,
+    schema: type[BaseModel],
+    acknowledgement: str | None = None,
+) -> dict:
+    """Run a schema-constrained extraction prompt against Gemini and return it as a dict"""
+    client = init_gemini()
+
     contents = [
-        types.Content(
-            role="user", parts=[types.Part.from_text(text=DATA_EXTRACTION_PROMPT)]
-        ),
-        types.Content(
-            role="user",
-            parts=[
-                types.Part.from_text(
-                    text=f"Extract data from this conversation:\n\n{conversation_text}"
-                )
-            ],
-        ),
+        *_extraction_prefix(prompt, acknowledgement),
+        types.Content(role="user", parts=[types.Part.from_text(text=request_text)]),
     ]
 
-    try:
-        generate_config = types.GenerateContentConfig(
-            response_mime_type="application/json",
-            thinking_config = types.ThinkingConfig(
-            thinking_budget=-1),
-            max_output_tokens=4000,
-            temperature=0.1
-        )
+    response = generate_with_retry(
+        client,
+        background=True,
+        model="gemini-2.5-flash",
+        contents=contents,
+        config=_extraction_config(schema),
+    )
 
-        response = client.models.generate_content(
-            model="gemini-2.5-flash", contents=contents, config=generate_config
-        )
+    # The SDK validates the JSON against the schema; null fields carry no facts
+    if response.parsed is not None:
+        return response.parsed.model_dump(exclude_none=True)
 
-        # Parse JSON response
-        json_text = response.text.strip() if response.text else ""
-        # Remove markdown formatting if present
-        if json_text.startswith("```json"):
-            json_text = json_text.replace("```json", "").replace("```", "").strip()
+    # Fall back to parsing the raw text if validation failed
+    json_text = strip_json_fence(response.text)
 
+    try:
         return json.loads(json_text)
+    except json.JSONDecodeError:
+        if DEBUG:
+            print(f"JSON text: {json_text}")
+        raise
+
+
+def extract_data_from_conversation(conversation_history):
+    """Extract structured data using Gemini API with data extraction prompt from latest and previous chat"""
+    # Use the latest 4 messages to capture both latest and previous chat context
+    conversation_text = _conversation_text(conversation_history, 4)
+
+    try:
+        return _run_extraction(
+            DATA_EXTRACTION_PROMPT,
+            f"Extract data from this conversation:\n\n{conversation_text}",
+            ProfileExtraction,
+        )
     except Exception as e:
-        # Debug: print the error and response
         print(f"Extraction error: {e}")
-        print(
-            f"Response text: {response.text if 'response' in locals() else 'No response'}"
-        )
-        print(f"JSON text: {json_text if 'json_text' in locals() else 'No json_text'}")
 
         # Fallback to default structure
-        return DEFAULT_EXTRACTED_DATA.copy()
+        return make_default_extracted_data()
 
 
 def init_chat_session_state():
@@ -244,9 +554,7 @@ def init_chat_session_state():
     if "messages" not in st.session_state:
         st.session_state.messages = []
     if "user_id" not in st.session_state:
-        st.session_state.user_id = str(uuid.uuid4())
-    if "extracted_data" not in st.session_state:
-        st.session_state.extracted_data = DEFAULT_EXTRACTED_DATA.copy()
+        st.session_state.user_id = uuid.uuid4().hex
     if "memory_bot" not in st.session_state:
         # Load saved Memory Bot data if user is logged in
         if st.session_state.get('logged_in', False) and st.session_state.get('user'):
@@ -254,217 +562,148 @@ def init_chat_session_state():
             user_id = st.session_state.user['id']
             st.session_state.memory_bot = load_memory_bot_data(user_id)
         else:
-            st.session_state.memory_bot = DEFAULT_EXTRACTED_DATA.copy()
+            st.session_state.memory_bot = make_default_extracted_data()
+        mark_memory_bot_changed()
 
 
 def extract_export_data_from_conversation(conversation_history):
     """Extract export readiness data using Gemini API with export-specific extraction prompt from latest and previous chat"""
-    client = init_gemini()
-
     # Use the latest 6 messages to capture both latest and previous chat context for export data
-    latest_messages = (
-        conversation_history[-6:]
-        if len(conversation_history) >= 6
-        else conversation_history
-    )
-
-    # Prepare conversation text
-    conversation_text = "\n".join(
-        [f"{msg['role']}: {msg.get('content', '')}" for msg in latest_messages]
-    )
+    conversation_text = _conversation_text(conversation_history, 6)
 
     # Check if conversation contains export-related keywords
-    export_keywords = [
-        "export",
-        "ekspor",
-        "international",
-        "negara",
-        "country",
-        "market",
-        "pasar",
-        "certification",
-        "sertifikasi",
-        "readiness",
-    ]
+    conversation_lower = conversation_text.lower()
     has_export_content = any(
-        keyword.lower() in conversation_text.lower() for keyword in export_keywords
+        keyword in conversation_lower for keyword in EXPORT_KEYWORDS
     )
 
     if not has_export_content:
         return {}
 
-    # Prepare contents for Gemini
-    contents = [
-        types.Content(
-            role="user",
-            parts=[types.Part.from_text(text=EXPORT_DATA_EXTRACTION_PROMPT)],
-        ),
-        types.Content(
-            role="model",
-            parts=[
-                types.Part.from_text(
-                    text="I understand. I will extract structured export readiness data from the conversation and return it as clean JSON."
-                )
-            ],
-        ),
-        types.Content(
-            role="user",
-            parts=[
-                types.Part.from_text(
-                    text=f"Extract export data from this conversation:\n\n{conversation_text}"
-                )
-            ],
-        ),
-    ]
-
     try:
-        generate_config = types.GenerateContentConfig(
-            response_mime_type="application/json",
-            max_output_tokens=4000,
-            temperature=0.1,
-            thinking_config = types.ThinkingConfig(
-            thinking_budget=-1)
+        return _run_extraction(
+            EXPORT_DATA_EXTRACTION_PROMPT,
+            f"Extract export data from this conversation:\n\n{conversation_text}",
+            ExportExtraction,
+            acknowledgement="I understand. I will extract structured export readiness data from the conversation and return it as clean JSON.",
         )
-
-        response = client.models.generate_content(
-            model="gemini-2.5-flash", contents=contents, config=generate_config
-        )
-
-        # Parse JSON response
-        json_text = response.text.strip() if response.text else ""
-        # Remove markdown formatting if present
-        if json_text.startswith("```json"):
-            json_text = json_text.replace("```json", "").replace("```", "").strip()
-
-        return json.loads(json_text)
     except Exception as e:
         print(f"Error extracting export data: {e}")
         return {}
 
 
-def extract_data_parallel(conversation_history):
-    """Extract both business profile and export data in parallel using ThreadPoolExecutor"""
-    
-    start_time = time.time()
-    
-    def run_profile_extraction():
-        """Run profile data extraction"""
-        profile_start = time.time()
-        result = extract_data_from_conversation(conversation_history)
-        profile_time = time.time() - profile_start
-        print(f"⚡ Profile extraction completed in {profile_time:.2f}s")
-        return result
-    
-    def run_export_extraction():
-        """Run export data extraction"""
-        export_start = time.time()
-        result = extract_export_data_from_conversation(conversation_history)
-        export_time = time.time() - export_start  
-        print(f"⚡ Export extraction completed in {export_time:.2f}s")
-        return result
-    
+# Greetings/acknowledgements that carry no profile or export facts (lowercase)
+_SMALL_TALK_WORDS = frozenset((
+    "halo", "hallo", "hai", "hi", "hello", "hey", "pagi", "siang", "sore", "malam",
+    "selamat", "terima", "kasih", "makasih", "thanks", "thank", "you", "tq",
+    "ok", "oke", "okay", "okey", "sip", "siap", "baik",
+    "mantap", "good", "nice", "wow", "hehe", "haha", "wkwk", "kak", "min",
+    "bang", "pak", "bu", "dong", "deh", "nih", "sih", "ah", "oh",
+))
+_WORD_RE = re.compile(r"\w+")
+
+
+def has_extractable_content(text: str) -> bool:
+    """Cheap pre-check so small-talk turns skip the Gemini extraction calls"""
+    words = _WORD_RE.findall((text or "").lower())
+    return any(word not in _SMALL_TALK_WORDS for word in words)
+
+
+# Runs each turn's Memory Bot extractions and history summary alongside the
+# streamed reply (up to three tasks per turn)
+_EXTRACTION_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=8, thread_name_prefix="chat-extraction"
+)
+
+
+def submit_extraction(conversation_history) -> tuple:
+    """Start the profile and export extractions as two independent pool tasks"""
+    history = list(conversation_history)
+    return (
+        _EXTRACTION_POOL.submit(extract_data_from_conversation, history),
+        _EXTRACTION_POOL.submit(extract_export_data_from_conversation, history),
+    )
+
+
+def collect_extraction(futures: tuple, timeout: float = 30) -> tuple:
+    """Wait for submit_extraction's futures and return (profile_data, export_data)"""
+    profile_future, export_future = futures
     try:
-        # Use ThreadPoolExecutor to run both extractions in parallel
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            # Submit both tasks
-            profile_future = executor.submit(run_profile_extraction)
-            export_future = executor.submit(run_export_extraction)
-            
-            # Get results (this will wait for both to complete)
-            profile_data = profile_future.result(timeout=30)  # 30 second timeout
-            export_data = export_future.result(timeout=30)
-            
-            total_time = time.time() - start_time
-            print(f"🚀 Parallel data extraction completed in {total_time:.2f}s")
-            
-            return profile_data, export_data
-            
+        return profile_future.result(timeout=timeout), export_future.result(timeout=timeout)
     except concurrent.futures.TimeoutError:
         print("Warning: Data extraction timed out, falling back to default data")
-        return DEFAULT_EXTRACTED_DATA.copy(), {}
-    except Exception as e:
-        print(f"Error in parallel data extraction: {e}")
-        # Fallback to sequential extraction
-        profile_data = extract_data_from_conversation(conversation_history)
-        export_data = extract_export_data_from_conversation(conversation_history)
-        return profile_data, export_data
+        return make_default_extracted_data(), {}
+
+
+def collect_summary(future, timeout: float = 30) -> str | None:
+    """Wait for a summarize_history future; None on failure or timeout"""
+    try:
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        print("Warning: History summary timed out, keeping the previous summary")
+        return None
+
+
+def _should_replace(existing_value, new_value) -> bool:
+    """Memory Bot rule: fill empty fields, or take a value more detailed than the existing one"""
+    return (
+        not existing_value
+        or not is_meaningful_value(existing_value)
+        or is_more_detailed_value(new_value, existing_value)
+    )
+
+
+def _merge(dst: dict, src: dict, protect_existing: bool = False):
+    """Merge meaningful values from src into dst (dicts one level deep); with protect_existing, only via _should_replace"""
+    for key, value in src.items():
+        if key == "extraction_timestamp" or not is_meaningful_value(value):
+            continue
+        if isinstance(value, dict):
+            target = dst.get(key)
+            if not isinstance(target, dict):
+                target = dst[key] = {}
+            for nested_key, nested_value in value.items():
+                if is_meaningful_value(nested_value) and (
+                    not protect_existing
+                    or _should_replace(target.get(nested_key), nested_value)
+                ):
+                    target[nested_key] = nested_value
+        elif not protect_existing or _should_replace(dst.get(key), value):
+            dst[key] = value
 
 
 def update_memory_bot(newly_extracted_data):
-    """Update memory_bot with meaningful values from extracted_data - persistent dictionary with existing data protection"""
+    """Update memory_bot with meaningful values from newly extracted data - persistent dictionary with existing data protection"""
     if newly_extracted_data and isinstance(newly_extracted_data, dict):
-        # Ensure memory_bot exists and is a copy of DEFAULT_EXTRACTED_DATA structure
+        # Ensure memory_bot exists and is a fresh default profile
         if "memory_bot" not in st.session_state:
-            st.session_state.memory_bot = DEFAULT_EXTRACTED_DATA.copy()
-
-        # Update extracted_data (temporary) - less restrictive filtering
-        for key, value in newly_extracted_data.items():
-            if key != "extraction_timestamp" and is_meaningful_value(value):
-                if isinstance(value, dict):
-                    # Ensure nested dict exists in extracted_data
-                    if key not in st.session_state.extracted_data:
-                        st.session_state.extracted_data[key] = {}
-                    # Update nested dictionary - only meaningful values
-                    for nested_key, nested_value in value.items():
-                        if is_meaningful_value(nested_value):
-                            st.session_state.extracted_data[key][nested_key] = nested_value
-                else:
-                    st.session_state.extracted_data[key] = value
-
-        # Update memory_bot with persistent merging and existing data protection
-        for key, value in newly_extracted_data.items():
-            if key != "extraction_timestamp" and is_meaningful_value(value):
-                if isinstance(value, dict):
-                    # Ensure nested dict exists in memory_bot
-                    if key not in st.session_state.memory_bot:
-                        st.session_state.memory_bot[key] = {}
-                    elif not isinstance(st.session_state.memory_bot[key], dict):
-                        st.session_state.memory_bot[key] = {}
-
-                    # Merge nested dictionary values persistently with existing data protection
-                    for nested_key, nested_value in value.items():
-                        if is_meaningful_value(nested_value):
-                            # Check if existing data exists and is meaningful
-                            existing_value = st.session_state.memory_bot[key].get(nested_key)
-
-                            # Only update if:
-                            # 1. No existing data exists, OR
-                            # 2. Existing data is not meaningful, OR
-                            # 3. New value is more specific/detailed than existing
-                            if (not existing_value or
-                                not is_meaningful_value(existing_value) or
-                                is_more_detailed_value(nested_value, existing_value)):
-                                st.session_state.memory_bot[key][nested_key] = nested_value
-                else:
-                    # Check existing simple value before updating
-                    existing_value = st.session_state.memory_bot.get(key)
-
-                    # Only update if:
-                    # 1. No existing data exists, OR
-                    # 2. Existing data is not meaningful, OR
-                    # 3. New value is more specific/detailed than existing
-                    if (not existing_value or
-                        not is_meaningful_value(existing_value) or
-                        is_more_detailed_value(value, existing_value)):
-                        st.session_state.memory_bot[key] = value
+            st.session_state.memory_bot = make_default_extracted_data()
+
+        # Keep existing data unless the new value is more detailed
+        _merge(st.session_state.memory_bot, newly_extracted_data, protect_existing=True)
 
         # Update timestamp
-        st.session_state.extracted_data["extraction_timestamp"] = datetime.now().isoformat()
+        st.session_state.memory_bot["extraction_timestamp"] = now_iso()
+        mark_memory_bot_changed()
 
         # Auto-save Memory Bot data to database if user is logged in (async)
         if st.session_state.get('logged_in', False) and st.session_state.get('user'):
             from .auth import AsyncDatabaseOperations
             user_id = st.session_state.user['id']
-            success, message = AsyncDatabaseOperations.save_memory_bot_data_async(user_id, st.session_state.memory_bot)
-            if not success:
-                print(f"Failed to auto-save Memory Bot data: {message}")
+            AsyncDatabaseOperations.save_memory_bot_data_async(user_id, st.session_state.memory_bot)
+
+# Placeholder strings the extractor uses for unknown values
+_PLACEHOLDER_VALUES = frozenset(
+    ("", "Not specified", "extraction_error", "Belum diisi", "unclear")
+)
+
 
 def is_meaningful_value(value):
     """Check if a value is meaningful and should be stored"""
     if value is None:
         return False
     if isinstance(value, str):
-        return value not in ["", "Not specified", "extraction_error", "Belum diisi", "unclear"]
+        return value not in _PLACEHOLDER_VALUES
     if isinstance(value, (list, dict)):
         return len(value) > 0
     if isinstance(value, (int, float)):
@@ -539,6 +778,60 @@ def show_welcome_message():
             """)
 
 
+# Messages drawn per rerun; "load earlier" widens the window by this much.
+# Kept below MAX_MESSAGES_IN_MEMORY, since older messages are archived anyway.
+CHAT_RENDER_WINDOW = 20
+
+
+def _load_earlier_messages():
+    """Widen the rendered chat window by one page"""
+    st.session_state.chat_render_window = (
+        st.session_state.get("chat_render_window", CHAT_RENDER_WINDOW)
+        + CHAT_RENDER_WINDOW
+    )
+
+
+def chat_image_html(image: dict) -> str:
+    """Build an inline <img> for a chat image from its precomputed thumbnail"""
+    src = image.get("thumbnail")
+    if not src:
+        encoded = base64.b64encode(load_image(image["path"])).decode("ascii")
+        src = f"data:{image['mime_type']};base64,{encoded}"
+    return (
+        f'<figure class="chat-image">'
+        f'<img src="{src}" width="300"/>'
+        f"<figcaption>📷 Gambar produk</figcaption>"
+        f"</figure>"
+    )
+
+
+@functools.lru_cache(maxsize=2048)
+def render_bubble(role: str, content: str) -> str:
+    """Build the text bubble HTML for a finished message (memoized; messages never change)"""
+    if role == "user":
+        return f"""
+        <div class="user-message">
+            {content}
+        </div>
+        """
+    # assistant message
+    return f"""
+        <div class="assistant-message">{content}</div>"""
+
+
+def chat_message_html(message: dict) -> str:
+    """Build the HTML for a chat message bubble (with any attached images)"""
+    html = render_bubble(message["role"], message["content"])
+    for img in message.get("images") or ():
+        html += chat_image_html(img)
+    return html
+
+
+def render_chat_message(message: dict):
+    """Render a single chat message bubble (with any attached images)"""
+    st.markdown(chat_message_html(message), unsafe_allow_html=True)
+
+
 def show_chat_interface():
     """Display the main chat interface"""
     col1, col2 = st.columns([2, 1])
@@ -546,19 +839,7 @@ def show_chat_interface():
     with col1:
         # Chat header
         st.markdown(
-            """
-        <div style="
-            background: linear-gradient(180deg, #2c3e50, #34495e);
-            color: white;
-            padding: 1.2rem;
-            border-radius: 15px;
-            margin-bottom: 1rem;
-            text-align: center;
-            font-weight: bold;
-            box-shadow: 0 6px 20px rgba(44, 62, 80, 0.3);
-            border: 1px solid rgba(255,255,255,0.2);
-        ">💬 Exporo Chat Assistant</div>
-        """,
+            '<div class="chat-panel-header">💬 Exporo Chat Assistant</div>',
             unsafe_allow_html=True,
         )
 
@@ -567,51 +848,27 @@ def show_chat_interface():
         
         with chat_container:
             if st.session_state.messages:
-                for message in st.session_state.messages:
-                    if message["role"] == "user":
-                        st.markdown(
-                            f"""
-                        <div class="user-message">
-                            {message["content"]}
-                        </div>
-                        """,
-                            unsafe_allow_html=True,
-                        )
-
-                        # Display images if present
-                        if message.get("images"):
-                            for img in message["images"]:
-                                st.image(
-                                    base64.b64decode(img["data"]),
-                                    caption="📷 Gambar produk",
-                                    width=300,
-                                )
-
-                    else:  # assistant message
-                        st.markdown(
-                            f"""
-                        <div class="assistant-message">{message["content"]}</div>""",
-                            unsafe_allow_html=True,
-                        )
+                # Only draw the newest messages; earlier ones on request
+                window = st.session_state.get("chat_render_window", CHAT_RENDER_WINDOW)
+                if len(st.session_state.messages) > window:
+                    st.button(
+                        "⬆️ Muat pesan sebelumnya",
+                        key="load_earlier_messages",
+                        on_click=_load_earlier_messages,
+                    )
+                # One element per bubble so unbalanced markup in a message
+                # (an unclosed code fence or tag) cannot swallow later ones
+                for message in st.session_state.messages[-window:]:
+                    render_chat_message(message)
             else:
                 # Show welcome message when no messages exist
                 st.markdown(
                     """
-                    <div style="
-                        text-align: center;
-                        padding: 2rem;
-                        color: #7f8c8d;
-                    ">
+                    <div class="chat-empty-state">
                         <h3 style="color: #2c3e50; margin-bottom: 1rem;">🤖 Selamat datang di Exporo Chat!</h3>
                         <p style="margin-bottom: 0.5rem;">Saya siap membantu Anda mempersiapkan bisnis untuk ekspor.</p>
                         <p style="margin-bottom: 1rem;">Mulai percakapan dengan mengetik pesan di bawah ini.</p>
-                        <div style="
-                            background: linear-gradient(135deg, #e3f2fd, #bbdefb);
-                            padding: 1rem;
-                            border-radius: 10px;
-                            border-left: 4px solid #2196f3;
-                            margin: 1rem 0;
-                        ">
+                        <div class="chat-empty-tip">
                             <strong>💡 Tips:</strong> Anda bisa ceritakan tentang produk, perusahaan, atau langsung minta analisis kesiapan ekspor!
                         </div>
                     </div>
@@ -619,6 +876,11 @@ def show_chat_interface():
                     unsafe_allow_html=True,
                 )
 
+        # Surface a missing/invalid Gemini setup once, instead of error bubbles
+        status = gemini_status()
+        if status != "ok":
+            st.error(f"⚠️ Gemini AI tidak tersedia: {status.removeprefix('err:')}")
+
         # Chat input with file upload support  
         prompt = st.chat_input(
             "Ketik pesan Anda dan/atau upload gambar produk...",
@@ -626,39 +888,44 @@ def show_chat_interface():
             file_type=["jpg", "jpeg", "png", "webp"],
         )
 
-        if prompt:
+        # Ignore empty submits (no text and no files) without calling Gemini
+        if prompt and ((prompt.text or "").strip() or prompt.files):
             # Prepare message data
             message_data = {
                 "role": "user",
                 "content": prompt.text if prompt.text else "",
                 "images": [],
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso(),
             }
 
             # Handle uploaded files
             if prompt.files:
                 for uploaded_file in prompt.files:
-                    # Convert image to base64 for storage
-                    image_bytes = uploaded_file.read()
-                    image_b64 = base64.b64encode(image_bytes).decode()
+                    # Downscale, upload once for Gemini and write to disk in
+                    # the background; session state keeps only the path
+                    image_bytes, mime_type = shrink_image(uploaded_file)
 
                     message_data["images"].append(
                         {
-                            "data": image_b64,
-                            "mime_type": uploaded_file.type,
+                            "path": store_image(
+                                st.session_state.user_id, image_bytes, mime_type
+                            ),
+                            "uri": upload_image(image_bytes, mime_type),
+                            "thumbnail": thumbnail_data_uri(image_bytes),
+                            "mime_type": mime_type,
                             "name": uploaded_file.name,
                         }
                     )
 
-            # Add user message to session state
+            # Add user message to session state and show it right away,
+            # without a full rerun
             st.session_state.messages.append(message_data)
+            with chat_container:
+                render_chat_message(message_data)
 
-            # Set flag to generate bot response
+            # Generate the bot response below in this same run
             st.session_state.generate_response = True
 
-            # Rerun to show user message immediately
-            st.rerun()
-
         # Generate bot response if flag is set
         if st.session_state.get("generate_response", False):
             # Clear the flag
@@ -669,44 +936,90 @@ def show_chat_interface():
                 # Get the last user message
                 last_user_message = st.session_state.messages[-1]
 
-                # Show typing indicator while getting bot response
-                with st.spinner("💭 Sedang mengetik..."):
-                    # Get bot response
-                    bot_response = get_bot_response(
-                        last_user_message["content"]
-                        if last_user_message["content"]
-                        else "Saya mengirim gambar untuk Anda lihat",
-                        st.session_state.messages[:-1],
-                        None,  # Files are already processed and stored in the message
+                # Start both Memory Bot extractions from the conversation so
+                # far while the reply streams, so the turn takes as long as
+                # the slowest call; small-talk turns ("halo", image-only)
+                # skip them entirely
+                extraction_futures = None
+                if has_extractable_content(last_user_message["content"]):
+                    extraction_futures = submit_extraction(st.session_state.messages)
+
+                # Fold turns that left the history window into the rolling
+                # summary once a full batch has built up
+                to_summarize = pending_summary_messages(st.session_state.messages)
+                summary_future = None
+                if len(to_summarize) >= SUMMARY_BATCH:
+                    summary_future = _EXTRACTION_POOL.submit(
+                        summarize_history,
+                        st.session_state.get("rolling_summary", ""),
+                        to_summarize,
                     )
 
-                    # Add bot response
-                    st.session_state.messages.append(
-                        {
-                            "role": "assistant",
-                            "content": bot_response,
-                            "timestamp": datetime.now().isoformat(),
-                        }
+                # Stream the bot response into a styled assistant bubble as
+                # it is generated, so it looks the same as once it is stored
+                with chat_container:
+                    placeholder = st.empty()
+                bot_response = ""
+                for piece in get_bot_response(
+                    last_user_message["content"]
+                    if last_user_message["content"]
+                    else "Saya mengirim gambar untuk Anda lihat",
+                    st.session_state.messages[:-1],
+                    last_user_message.get("images"),
+                ):
+                    bot_response += piece
+                    placeholder.markdown(
+                        f'<div class="assistant-message">{bot_response}</div>',
+                        unsafe_allow_html=True,
                     )
 
-                    # Extract data immediately after bot response (parallel processing)
-                    newly_extracted_data, export_data = extract_data_parallel(st.session_state.messages)
+                # Add bot response
+                st.session_state.messages.append(
+                    {
+                        "role": "assistant",
+                        "content": bot_response,
+                        "timestamp": now_iso(),
+                    }
+                )
+
+                with st.spinner("🧠 Memperbarui Memory Bot..."):
+                    if extraction_futures is not None:
+                        # Usually already finished by the time the reply is done
+                        newly_extracted_data, export_data = collect_extraction(
+                            extraction_futures
+                        )
 
-                    # Merge export data with business data
-                    if export_data:
-                        if "export_readiness" in export_data:
-                            newly_extracted_data["export_readiness"] = export_data["export_readiness"]
-                        if "assessment_history" in export_data:
-                            newly_extracted_data["assessment_history"] = export_data["assessment_history"]
+                        # Merge export data with business data
+                        if export_data:
+                            if "export_readiness" in export_data:
+                                newly_extracted_data["export_readiness"] = export_data["export_readiness"]
+                            if "assessment_history" in export_data:
+                                newly_extracted_data["assessment_history"] = export_data["assessment_history"]
 
-                    # Store extracted data for immediate use in this render cycle
-                    st.session_state.latest_extracted_data = newly_extracted_data
+                        # Store extracted data for immediate use in this render cycle
+                        st.session_state.latest_extracted_data = newly_extracted_data
 
-                    # Update memory bot
-                    update_memory_bot(newly_extracted_data)
+                        # Update memory bot
+                        update_memory_bot(newly_extracted_data)
+
+                    # Only mark messages summarized once they are in the summary
+                    summary = (
+                        collect_summary(summary_future)
+                        if summary_future is not None
+                        else None
+                    )
+                    if summary is not None:
+                        st.session_state.rolling_summary = summary
+                        for msg in to_summarize:
+                            msg["summarized"] = True
+
+                # Move older messages out of session state into the archive
+                archive_old_messages(
+                    st.session_state.user_id, st.session_state.messages
+                )
 
-                # Rerun to show bot response
-                st.rerun()
+                # No rerun needed: the reply is already on screen and the
+                # memory bot column renders after this point
             else:
                 # If no messages, clear the flag and don't generate response
                 st.session_state.generate_response = False
@@ -715,22 +1028,49 @@ def show_chat_interface():
         show_memory_bot()
 
 
+def mark_memory_bot_changed():
+    """Bump the Memory Bot version so its cached JSON views are rebuilt"""
+    st.session_state.memory_bot_version = (
+        st.session_state.get("memory_bot_version", 0) + 1
+    )
+
+
+def _dump_json(payload) -> str:
+    """Pretty-print memory bot data as JSON"""
+    return json.dumps(payload, indent=2, ensure_ascii=False)
+
+
+def _memory_bot_json(memory_data: dict) -> dict:
+    """JSON views of the Memory Bot, re-dumped only when its version changes"""
+    version = st.session_state.get("memory_bot_version", 0)
+    cached = st.session_state.get("memory_bot_json")
+    if cached is None or cached[0] != version:
+        cached = (
+            version,
+            {
+                "business": _dump_json(
+                    {
+                        k: v
+                        for k, v in memory_data.items()
+                        if k not in ["export_readiness", "assessment_history"]
+                    }
+                ),
+                "export_readiness": _dump_json(memory_data.get("export_readiness", {})),
+                "assessment_history": _dump_json(
+                    memory_data.get("assessment_history", [])
+                ),
+                "full": _dump_json(memory_data),
+            },
+        )
+        st.session_state.memory_bot_json = cached
+    return cached[1]
+
+
+@st.fragment
 def show_memory_bot():
-    """Display the memory bot sidebar"""
+    """Display the memory bot sidebar (reruns on its own for save clicks)"""
     st.markdown(
-        """
-    <div style="
-        background: linear-gradient(180deg, #2c3e50, #34495e);
-        color: white;
-        padding: 1.2rem;
-        border-radius: 15px;
-        margin-bottom: 1rem;
-        text-align: center;
-        font-weight: bold;
-        box-shadow: 0 6px 20px rgba(44, 62, 80, 0.3);
-        border: 1px solid rgba(255,255,255,0.2);
-    ">🧠 Memory Bot</div>
-    """,
+        '<div class="chat-panel-header">🧠 Memory Bot</div>',
         unsafe_allow_html=True,
     )
 
@@ -750,16 +1090,11 @@ def show_memory_bot():
                     display_data[key] = value
         memory_data = display_data
 
+    memory_json = _memory_bot_json(memory_data)
+
     # Show business profile section
     st.markdown("**👤 Business Profile**")
-    business_data = {
-        k: v
-        for k, v in memory_data.items()
-        if k not in ["export_readiness", "assessment_history"]
-    }
-    st.code(
-        json.dumps(business_data, indent=2, ensure_ascii=False), language="json"
-    )
+    st.code(memory_json["business"], language="json")
 
     # Show export readiness section if data exists
     export_readiness = memory_data.get("export_readiness", {})
@@ -767,28 +1102,24 @@ def show_memory_bot():
         v != "Not specified" and v != [] for v in export_readiness.values()
     ):
         st.markdown("**🌍 Export Readiness Profile**")
-        st.code(
-            json.dumps(export_readiness, indent=2, ensure_ascii=False),
-            language="json",
-        )
+        st.code(memory_json["export_readiness"], language="json")
 
     # Show assessment history if exists
     assessment_history = memory_data.get("assessment_history", [])
     if assessment_history:
         st.markdown("**📊 Assessment History**")
-        st.code(
-            json.dumps(assessment_history, indent=2, ensure_ascii=False),
-            language="json",
-        )
+        st.code(memory_json["assessment_history"], language="json")
 
     # Add manual save button and download option
     col1, col2 = st.columns(2)
     with col1:
         if st.button("💾 Save to Database", help="Save Memory Bot data to database"):
             if st.session_state.get('logged_in', False) and st.session_state.get('user'):
-                from .auth import save_memory_bot_data
+                from .auth import AsyncDatabaseOperations
                 user_id = st.session_state.user['id']
-                success, message = save_memory_bot_data(user_id, st.session_state.memory_bot)
+                success, message = AsyncDatabaseOperations.save_memory_bot_data_now(
+                    user_id, st.session_state.memory_bot
+                )
                 if success:
                     st.success("✅ Memory Bot data saved!")
                 else:
@@ -798,10 +1129,9 @@ def show_memory_bot():
 
     with col2:
         # Download Memory Bot data as JSON
-        memory_json = json.dumps(memory_data, indent=2, ensure_ascii=False)
         st.download_button(
             label="📥 Download JSON",
-            data=memory_json,
+            data=memory_json["full"],
             file_name=f"memory_bot_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
             mime="application/json",
             help="Download Memory Bot data as JSON file"
@@ -811,12 +1141,22 @@ def show_memory_bot():
         st.write("Mulai percakapan untuk melihat data yang diekstrak...")
 
 
+def clear_conversation(new_session: bool = True):
+    """Drop the current conversation (messages, archive, summary), optionally starting a new chat session ID"""
+    if "user_id" in st.session_state:
+        discard_history(st.session_state.user_id)
+    st.session_state.messages = []
+    st.session_state.pop("chat_render_window", None)
+    st.session_state.pop("rolling_summary", None)
+    if new_session or "user_id" not in st.session_state:
+        st.session_state.user_id = uuid.uuid4().hex
+
+
 def reset_chat():
     """Reset chat data"""
-    st.session_state.messages = []
-    st.session_state.user_id = str(uuid.uuid4())  # New session ID
-    st.session_state.extracted_data = DEFAULT_EXTRACTED_DATA.copy()
-    st.session_state.memory_bot = DEFAULT_EXTRACTED_DATA.copy()
+    clear_conversation()
+    st.session_state.memory_bot = make_default_extracted_data()
+    mark_memory_bot_changed()
 
 
 def show_chat_reset_button():
@@ -847,25 +1187,7 @@ def perform_chat_based_export_analysis(target_country: str, memory_data: dict) -
         f"{location.get('city', '')}, {location.get('province', '')}, Indonesia"
     )
 
-    # Country mapping for difficulty and market size
-    countries_info = {
-        "Amerika Serikat": {"difficulty": "High", "market_size": "Large"},
-        "US": {"difficulty": "High", "market_size": "Large"},
-        "Uni Eropa": {"difficulty": "High", "market_size": "Large"},
-        "EU": {"difficulty": "High", "market_size": "Large"},
-        "Jepang": {"difficulty": "High", "market_size": "Large"},
-        "Japan": {"difficulty": "High", "market_size": "Large"},
-        "Singapura": {"difficulty": "Medium", "market_size": "Medium"},
-        "Singapore": {"difficulty": "Medium", "market_size": "Medium"},
-        "Malaysia": {"difficulty": "Low", "market_size": "Medium"},
-        "Australia": {"difficulty": "Medium", "market_size": "Large"},
-        "Korea Selatan": {"difficulty": "Medium", "market_size": "Large"},
-        "South Korea": {"difficulty": "Medium", "market_size": "Large"},
-        "China": {"difficulty": "High", "market_size": "Very Large"},
-        "Cina": {"difficulty": "High", "market_size": "Very Large"},
-    }
-
-    country_info = countries_info.get(
+    country_info = COUNTRY_MARKET_INFO.get(
         target_country, {"difficulty": "Medium", "market_size": "Medium"}
     )
 
@@ -885,8 +1207,8 @@ def perform_chat_based_export_analysis(target_country: str, memory_data: dict) -
         )
 
         # Send to Gemini for analysis
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-exp", contents=formatted_prompt
+        response = generate_with_retry(
+            client, model="gemini-2.0-flash-exp", contents=formatted_prompt
         )
 
         # Parse the AI response
@@ -894,9 +1216,7 @@ def perform_chat_based_export_analysis(target_country: str, memory_data: dict) -
 
         # Try to parse as JSON first for structured data
         try:
-            assessment_data = json.loads(
-                ai_response.replace("```json", "").replace("```", "").strip()
-            )
+            assessment_data = json.loads(strip_json_fence(ai_response))
 
             # Convert to readable format for chat
             readable_response = f"""
@@ -936,7 +1256,7 @@ def perform_chat_based_export_analysis(target_country: str, memory_data: dict) -
             assessment_record = {
                 "country": target_country,
                 "score": assessment_data.get("overall_score", 0),
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso(),
                 "status": assessment_data.get("export_readiness_level", "Assessed"),
                 "product": product_name,
                 "category": product_category,
@@ -950,6 +1270,7 @@ def perform_chat_based_export_analysis(target_country: str, memory_data: dict) -
             ]
 
             st.session_state.memory_bot["assessment_history"].append(assessment_record)
+            mark_memory_bot_changed()
 
             # Auto-save updated Memory Bot data with assessment (async)
             if st.session_state.get('logged_in', False) and st.session_state.get('user'):
@@ -990,7 +1311,8 @@ def perform_multi_country_export_analysis(target_countries: list, memory_data: d
             country_start = time.time()
             response = perform_chat_based_export_analysis(country, memory_data)
             country_time = time.time() - country_start
-            print(f"⚡ Analysis for {country} completed in {country_time:.2f}s")
+            if DEBUG:
+                print(f"⚡ Analysis for {country} completed in {country_time:.2f}s")
             return country, response, None
         except Exception as e:
             return country, None, str(e)
@@ -998,7 +1320,8 @@ def perform_multi_country_export_analysis(target_countries: list, memory_data: d
     if not target_countries:
         return {}
     
-    print(f"🚀 Starting parallel analysis for {len(target_countries)} countries")
+    if DEBUG:
+        print(f"🚀 Starting parallel analysis for {len(target_countries)} countries")
     results = {}
     
     try:
@@ -1056,7 +1379,8 @@ def perform_multi_country_export_analysis(target_countries: list, memory_data: d
     
     total_time = time.time() - start_time
     successful_countries = sum(1 for r in results.values() if r.get("success", False))
-    print(f"🚀 Multi-country analysis completed: {successful_countries}/{len(target_countries)} countries in {total_time:.2f}s")
+    if DEBUG:
+        print(f"🚀 Multi-country analysis completed: {successful_countries}/{len(target_countries)} countries in {total_time:.2f}s")
     
     return results
 
@@ -1102,44 +1426,14 @@ def detect_export_analysis_request(
     """Detect if user is requesting export analysis and extract target country"""
     user_input_lower = user_input.lower()
 
-    # Keywords that trigger export analysis
-    analysis_triggers = [
-        "cek kesiapan ekspor",
-        "analisis ekspor",
-        "export readiness",
-        "siap ekspor",
-        "kesiapan ekspor",
-        "analisis kesiapan",
-    ]
-
-    # Country keywords
-    countries = {
-        "amerika": "Amerika Serikat",
-        "us": "Amerika Serikat",
-        "usa": "Amerika Serikat",
-        "eropa": "Uni Eropa",
-        "eu": "Uni Eropa",
-        "europe": "Uni Eropa",
-        "jepang": "Jepang",
-        "japan": "Jepang",
-        "singapura": "Singapura",
-        "singapore": "Singapura",
-        "malaysia": "Malaysia",
-        "australia": "Australia",
-        "korea": "Korea Selatan",
-        "south korea": "Korea Selatan",
-        "china": "China",
-        "cina": "China",
-    }
-
     # Check if analysis is requested
     analysis_requested = any(
-        trigger in user_input_lower for trigger in analysis_triggers
+        trigger in user_input_lower for trigger in ANALYSIS_TRIGGERS
     )
 
     # Extract country if mentioned
     target_country = None
-    for keyword, country_name in countries.items():
+    for keyword, country_name in COUNTRY_KEYWORDS.items():
         if keyword in user_input_lower:
             target_country = country_name
             break
@@ -1166,8 +1460,7 @@ def show_full_chat_page():
 
     # Auto-reset chat if coming from a different page (not chat)
     if last_page != "" and last_page != "chat":
-        st.session_state.messages = []
-        st.session_state.user_id = str(uuid.uuid4())
+        clear_conversation()
 
     # Update last page tracker
     st.session_state.last_page = current_page
@@ -1181,14 +1474,14 @@ def show_full_chat_page():
         st.session_state.trigger_export_readiness = False
 
         # Clear any existing messages for fresh start with export readiness
-        st.session_state.messages = []
+        clear_conversation(new_session=False)
 
         # Auto-add export readiness request message
         auto_message = {
             "role": "user",
             "content": "Cek kesiapan ekspor",
             "images": [],
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
         }
         st.session_state.messages.append(auto_message)
 
@@ -1198,17 +1491,9 @@ def show_full_chat_page():
     # Chat page header
     st.markdown(
         """
-    <div style="
-        background: linear-gradient(180deg, #2c3e50, #34495e);
-        padding: 1rem;
-        border-radius: 12px;
-        text-align: center;
-        margin-bottom: 1rem;
-        box-shadow: 0 4px 15px rgba(44, 62, 80, 0.3);
-        border: 1px solid rgba(255,255,255,0.2);
-    ">
+    <div class="chat-page-header">
         <h2 style="color: white; margin: 0; font-size: 1.5rem;">💬 Chat dengan Exporo</h2>
-        <p style="color: rgba(255,255,255,0.9); margin: 0.3rem 0 0 0; font-size: 0.9rem;">
+        <p>
             Asisten AI untuk profiling bisnis ekspor Anda
         </p>
     </div>
@@ -4,7 +4,11 @@ Contains shared constants, API keys, and default data structures
 """
 
 import os
-from datetime import datetime
+import re
+import orjson
+import functools
+from datetime import datetime, timezone
+from types import MappingProxyType
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -14,45 +18,88 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 DATABASE_NAME = "data/langkah_ekspor.db"
 
+# Verbose timing/payload logging to stdout; off unless DEBUG is set
+DEBUG = bool(os.getenv("DEBUG"))
+
+# Comma-separated emails allowed to see admin-only stats (e.g. the footer user count)
+ADMIN_EMAILS = frozenset(
+    email.strip().lower()
+    for email in os.getenv("ADMIN_EMAILS", "").split(",")
+    if email.strip()
+)
+
+
+@functools.lru_cache(maxsize=1)
+def gemini_api_key() -> str | None:
+    """Return the Gemini API key from st.secrets, falling back to the environment"""
+    import streamlit as st
+
+    try:
+        key = st.secrets.get("GEMINI_API_KEY")
+    except Exception:
+        # No secrets.toml configured
+        key = None
+    return key or GEMINI_API_KEY
+
+
 # App Configuration
 APP_TITLE = "Exporo - SME Export Assistant"
 APP_ICON = "🚀"
 
 # Default data structures
-DEFAULT_EXTRACTED_DATA = {
-    "company_name": "Not specified",
-    "product_details": {
-        "name": "Not specified",
-        "description": "Not specified",
-        "unique_features": "Not specified",
-    },
-    "production_capacity": {
-        "amount": 0,
-        "unit": "Not specified",
-        "timeframe": "Not specified",
-    },
-    "product_category": "Not specified",
-    "production_location": {
-        "city": "Not specified",
-        "province": "Not specified",
-        "country": "Indonesia",
-    },
-    "business_background": "Not specified",
-    "export_readiness": {
-        "target_countries": [],
-        "export_experience": "Not specified",
-        "current_markets": [],
-        "export_goals": "Not specified",
-        "budget_for_export": "Not specified",
-        "timeline_preference": "Not specified",
-        "main_challenges": [],
-        "certifications_obtained": [],
-        "export_volume_target": "Not specified",
-    },
-    "assessment_history": [],
-    "extraction_timestamp": datetime.now().isoformat(),
-    "conversation_language": "Indonesian",
-}
+# Read-only template; call make_default_extracted_data() for a mutable copy
+DEFAULT_EXTRACTED_DATA = MappingProxyType(
+    {
+        "company_name": "Not specified",
+        "product_details": {
+            "name": "Not specified",
+            "description": "Not specified",
+            "unique_features": "Not specified",
+        },
+        "production_capacity": {
+            "amount": 0,
+            "unit": "Not specified",
+            "timeframe": "Not specified",
+        },
+        "product_category": "Not specified",
+        "production_location": {
+            "city": "Not specified",
+            "province": "Not specified",
+            "country": "Indonesia",
+        },
+        "business_background": "Not specified",
+        "export_readiness": {
+            "target_countries": [],
+            "export_experience": "Not specified",
+            "current_markets": [],
+            "export_goals": "Not specified",
+            "budget_for_export": "Not specified",
+            "timeline_preference": "Not specified",
+            "main_challenges": [],
+            "certifications_obtained": [],
+            "export_volume_target": "Not specified",
+        },
+        "assessment_history": [],
+        "conversation_language": "Indonesian",
+    }
+)
+
+
+def now_iso() -> str:
+    """Return the current UTC time as a seconds-precision ISO 8601 string"""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+# Serialized once; orjson.loads of this is a cheaper full-depth copy than deepcopy
+_DEFAULT_EXTRACTED_BYTES = orjson.dumps(dict(DEFAULT_EXTRACTED_DATA))
+
+
+def make_default_extracted_data() -> dict:
+    """Return a fresh default profile stamped with the current extraction time"""
+    data = orjson.loads(_DEFAULT_EXTRACTED_BYTES)
+    data["extraction_timestamp"] = now_iso()
+    return data
+
 
 # Bot prompts
 USER_PROFILING_PROMPT = """You are Exporo, a friendly Business Profile Assistant helping Indonesian SMEs prepare for export. Your goal is to gather essential information about their business through a natural, conversational approach and guide them through export readiness assessment.
@@ -174,6 +221,25 @@ When user mentions specific countries or asks for export analysis:
 
 Always maintain the friendly, supportive Exporo personality while demonstrating deep export expertise."""
 
+
+@functools.lru_cache(maxsize=128)
+def format_export_focused_prompt(
+    company_name: str,
+    product_name: str,
+    product_category: str,
+    production_capacity: str,
+    production_location: str,
+) -> str:
+    """Format EXPORT_FOCUSED_PROMPT once per distinct business profile"""
+    return EXPORT_FOCUSED_PROMPT.format(
+        company_name=company_name,
+        product_name=product_name,
+        product_category=product_category,
+        production_capacity=production_capacity,
+        production_location=production_location,
+    )
+
+
 DATA_EXTRACTION_PROMPT = """You are a Data Extraction Assistant. Your role is to parse conversation history and extract structured business profile data.
 
 **Extract the following information:**
@@ -324,6 +390,16 @@ Return ONLY valid JSON with this exact structure:
 
 Provide realistic, practical advice based on actual export requirements and market conditions."""
 
+HISTORY_SUMMARY_PROMPT = """You maintain a running summary of a chat between an Indonesian SME owner and Exporo, an export assistant.
+
+Update the existing summary with the new messages below. Keep every concrete fact about the business (company, products, capacity, location, certifications, target countries, decisions and open questions) and drop small talk. Reply in the conversation's language, as plain prose of at most 200 words.
+
+Existing summary:
+{summary}
+
+New messages:
+{messages}"""
+
 # CSS Styles
 SHARED_CSS = """
 <style>
@@ -401,6 +477,69 @@ SHARED_CSS = """
         backdrop-filter: blur(5px);
     }
 
+    /* Chat page panels (kept here so reruns don't resend inline styles) */
+    .chat-panel-header {
+        background: linear-gradient(180deg, #2c3e50, #34495e);
+        color: white;
+        padding: 1.2rem;
+        border-radius: 15px;
+        margin-bottom: 1rem;
+        text-align: center;
+        font-weight: bold;
+        box-shadow: 0 6px 20px rgba(44, 62, 80, 0.3);
+        border: 1px solid rgba(255,255,255,0.2);
+    }
+
+    .chat-page-header {
+        background: linear-gradient(180deg, #2c3e50, #34495e);
+        padding: 1rem;
+        border-radius: 12px;
+        text-align: center;
+        margin-bottom: 1rem;
+        box-shadow: 0 4px 15px rgba(44, 62, 80, 0.3);
+        border: 1px solid rgba(255,255,255,0.2);
+    }
+
+    .chat-page-header p {
+        color: rgba(255,255,255,0.9);
+        margin: 0.3rem 0 0 0;
+        font-size: 0.9rem;
+    }
+
+    .chat-empty-state {
+        text-align: center;
+        padding: 2rem;
+        color: #7f8c8d;
+    }
+
+    .chat-empty-tip {
+        background: linear-gradient(135deg, #e3f2fd, #bbdefb);
+        padding: 1rem;
+        border-radius: 10px;
+        border-left: 4px solid #2196f3;
+        margin: 1rem 0;
+    }
+
+    .chat-image {
+        margin: 0.5rem 0;
+    }
+
+    .chat-image figcaption {
+        font-size: 0.8rem;
+        color: #7f8c8d;
+    }
+
+    .profile-section {
+        display: grid;
+        grid-template-columns: 1fr 1fr;
+        gap: 0 2rem;
+        margin-bottom: 1rem;
+    }
+
+    .profile-section p {
+        margin: 0 0 0.75rem 0;
+    }
+
     .message-time {
         font-size: 11px;
         color: #667781;
@@ -514,3 +653,92 @@ SHARED_CSS = """
     }
 </style>
 """
+
+# Dark sidebar styling for logged-in users
+SIDEBAR_CSS = """
+<style>
+    .sidebar .block-container {
+        background: linear-gradient(180deg, #2c3e50, #34495e) !important;
+        color: white;
+        border-radius: 0;
+        padding: 2rem 1rem !important;
+    }
+    .sidebar-header {
+        background: linear-gradient(135deg, #2c3e50, #34495e);
+        padding: 1.5rem 1rem;
+        text-align: center;
+        margin: -1rem -1rem 1rem -1rem;
+        border-radius: 0;
+    }
+    .user-profile {
+        display: flex;
+        align-items: center;
+        gap: 0.8rem;
+        margin-bottom: 1rem;
+        padding: 1rem;
+        background: rgba(255,255,255,0.1);
+        border-radius: 10px;
+    }
+    .nav-item {
+        display: flex;
+        align-items: center;
+        gap: 0.8rem;
+        padding: 0.8rem 1rem;
+        margin: 0.3rem 0;
+        border-radius: 8px;
+        color: white;
+        text-decoration: none;
+        transition: all 0.3s ease;
+    }
+    .nav-item:hover {
+        background: rgba(255,255,255,0.1);
+    }
+    .nav-item.active {
+        background: linear-gradient(135deg, #3498db, #2980b9);
+        color: white;
+    }
+    .nav-icon {
+        font-size: 1.2rem;
+        width: 24px;
+    }
+    .stButton > button {
+        font-size: 0.85rem !important;
+    }
+    .stSidebar .stButton > button {
+        background: linear-gradient(135deg, #4a6741, #5a7a51) !important;
+        color: white !important;
+        border: 1px solid rgba(255,255,255,0.2) !important;
+    }
+    .stSidebar .stButton > button:hover {
+        background: linear-gradient(135deg, #5a7a51, #6a8a61) !important;
+    }
+    .stMarkdown {
+        margin-bottom: 0 !important;
+        margin-top: 0 !important;
+    }
+    .stSidebar .stMarkdown {
+        margin: 0 !important;
+        padding: 0 !important;
+    }
+    .stSidebar [data-testid="stMarkdownContainer"] {
+        margin: 0 !important;
+        padding: 0 !important;
+    }
+</style>
+"""
+
+
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE_RE = re.compile(r"\s+")
+_CSS_PUNCT_RE = re.compile(r"\s*([{};,>])\s*|(?<=:)\s+")
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace from a <style> block"""
+    css = _CSS_SPACE_RE.sub(" ", _CSS_COMMENT_RE.sub("", css))
+    return _CSS_PUNCT_RE.sub(lambda m: m.group(1) or "", css).strip()
+
+
+# Minified once at import; these are what the app actually injects
+SHARED_CSS_MIN = minify_css(SHARED_CSS)
+SIDEBAR_CSS_MIN = minify_css(SIDEBAR_CSS)
@@ -5,26 +5,56 @@ Displays export progress tracking interface similar to the reference design
 
 import streamlit as st
 import json
-import sqlite3
 from datetime import datetime
-from .config import DATABASE_NAME, DEFAULT_EXTRACTED_DATA
-from .auth import load_memory_bot_data
-
-
+from types import MappingProxyType
+from .config import DEFAULT_EXTRACTED_DATA
+from .auth import get_conn, load_memory_bot_data
+
+# Recommended countries with flags and difficulty levels
+COUNTRY_CARD_DATA = MappingProxyType({
+    "Singapore": {"flag": "🇸🇬", "difficulty": "Mudah", "color": "#4CAF50"},
+    "Malaysia": {"flag": "🇲🇾", "difficulty": "Mudah", "color": "#4CAF50"},
+    "Australia": {"flag": "🇦🇺", "difficulty": "Sedang", "color": "#FF9800"},
+    "Japan": {"flag": "🇯🇵", "difficulty": "Sulit", "color": "#F44336"},
+    "Amerika Serikat": {"flag": "🇺🇸", "difficulty": "Sulit", "color": "#F44336"},
+})
+
+# Export progress checklist labels, in display order
+STAGE1_CHECKLIST = (
+    "Company Assesment",
+    "Validasi standar mutu dan keamanan sesuai standar internasional",
+    "Identifikasi keunikan atau nilai tambah produk sebagai USP",
+)
+STAGE1_PENDING = "Tentukan HS Code produk untuk klasifikasi bea cukai"
+STAGE2_CHECKLIST = (
+    "Riset pasar dan preferensi konsumen di berbagai negara",
+    "Identifikasi kebutuhan dan kebotuhan utama mereka",
+)
+STAGE2_PENDING = (
+    "Bandingkan harga kompetitor di marketplace internasional",
+    "Tentukan harga jual ekspor dengan memperhitungkan seluruh biaya dan margin",
+)
+
+# Country card (border color, background, status label) per recommendation state
+COUNTRY_CARD_STYLES = MappingProxyType({
+    "assessed": ("#4CAF50", "rgba(76, 175, 80, 0.1)", "✅ Dinilai"),
+    "target": ("#2196F3", "rgba(33, 150, 243, 0.1)", "🎯 Target"),
+    "available": ("#e0e0e0", "#ffffff", "📋 Tersedia"),
+})
+
+
+_SQL_DASHBOARD_USER = (
+    "SELECT first_name, last_name, email, created_at FROM users WHERE id = ?"
+)
+
+
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
 def get_dashboard_data(user_id: int) -> dict:
-    """Fetch and process all dashboard data from database"""
+    """Fetch and process all dashboard data from database (cached per user)"""
     try:
         # Get user info from users table
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT first_name, last_name, email, created_at
-            FROM users WHERE id = ?
-        """, (user_id,))
-
-        user_data = cursor.fetchone()
-        conn.close()
+        with get_conn() as conn:
+            user_data = conn.execute(_SQL_DASHBOARD_USER, (user_id,)).fetchone()
 
         if not user_data:
             return {}
@@ -39,12 +69,7 @@ def get_dashboard_data(user_id: int) -> dict:
         assessment_summary = get_assessment_summary(memory_data)
 
         return {
-            "user": {
-                "first_name": user_data[0],
-                "last_name": user_data[1],
-                "email": user_data[2],
-                "created_at": user_data[3]
-            },
+            "user": dict(user_data),
             "business_profile": memory_data,
             "profile_completeness": profile_status,
             "assessment_summary": assessment_summary
@@ -216,14 +241,11 @@ def show_dashboard_page():
         show_country_recommendations(assessment_summary)
 
 
-def show_profile_summary(business_profile: dict, profile_status: dict):
-    """Display business profile summary card"""
-    st.markdown("### 👤 Detail Produk")
-
-    # Profile completion indicator
-    completion_color = "#4CAF50" if profile_status["is_complete"] else "#FF9800"
-    st.markdown(
-        f"""
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
+def build_completion_card_html(is_complete: bool, percentage: int, completed: int, total: int) -> str:
+    """Build the profile completion card HTML (cached per completion state)"""
+    completion_color = "#4CAF50" if is_complete else "#FF9800"
+    return f"""
         <div style="
             background: linear-gradient(145deg, #ffffff, #f8f9fb);
             padding: 1.5rem;
@@ -245,15 +267,29 @@ def show_profile_summary(business_profile: dict, profile_status: dict):
                     font-weight: bold;
                     margin-right: 1rem;
                 ">
-                    {int(float(profile_status.get("percentage", 0)))}%
+                    {percentage}%
                 </div>
                 <div>
                     <div style="font-weight: bold; color: #2c3e50;">Profil Lengkap</div>
-                    <div style="font-size: 0.9rem; color: #7f8c8d;">{int(profile_status.get("completed", 0))}/{int(profile_status.get("total", 1))} selesai</div>
+                    <div style="font-size: 0.9rem; color: #7f8c8d;">{completed}/{total} selesai</div>
                 </div>
             </div>
         </div>
-        """,
+        """
+
+
+def show_profile_summary(business_profile: dict, profile_status: dict):
+    """Display business profile summary card"""
+    st.markdown("### 👤 Detail Produk")
+
+    # Profile completion indicator
+    st.markdown(
+        build_completion_card_html(
+            bool(profile_status["is_complete"]),
+            int(float(profile_status.get("percentage", 0))),
+            int(profile_status.get("completed", 0)),
+            int(profile_status.get("total", 1)),
+        ),
         unsafe_allow_html=True,
     )
 
@@ -373,16 +409,10 @@ def show_export_progress_tracker(business_profile: dict, assessment_summary: dic
         capacity_complete = False
 
     st.markdown("**Rangkuman:**")
-    status_icon = "✅" if company_complete else "⏳"
-    st.markdown(f"{status_icon} Company Assesment")
+    for done, label in zip((company_complete, product_complete, capacity_complete), STAGE1_CHECKLIST):
+        st.markdown(f"{'✅' if done else '⏳'} {label}")
 
-    status_icon = "✅" if product_complete else "⏳"
-    st.markdown(f"{status_icon} Validasi standar mutu dan keamanan sesuai standar internasional")
-
-    status_icon = "✅" if capacity_complete else "⏳"
-    st.markdown(f"{status_icon} Identifikasi keunikan atau nilai tambah produk sebagai USP")
-
-    st.markdown(f"**Belum diselesaikan** • Tentukan HS Code produk untuk klasifikasi bea cukai")
+    st.markdown(f"**Belum diselesaikan** • {STAGE1_PENDING}")
 
     st.markdown("---")
 
@@ -409,38 +439,16 @@ def show_export_progress_tracker(business_profile: dict, assessment_summary: dic
 
     # Stage 2 checklist
     st.markdown("**Rangkuman:**")
-    status_icon = "✅" if has_assessments else "⏳"
-    st.markdown(f"{status_icon} Riset pasar dan preferensi konsumen di berbagai negara")
-
-    status_icon = "✅" if has_targets else "⏳"
-    st.markdown(f"{status_icon} Identifikasi kebutuhan dan kebotuhan utama mereka")
+    for done, label in zip((has_assessments, has_targets), STAGE2_CHECKLIST):
+        st.markdown(f"{'✅' if done else '⏳'} {label}")
 
-    st.markdown("⏳ Bandingkan harga kompetitor di marketplace internasional")
-    st.markdown("⏳ Tentukan harga jual ekspor dengan memperhitungkan seluruh biaya dan margin")
+    for label in STAGE2_PENDING:
+        st.markdown(f"⏳ {label}")
 
 
-def show_global_expansion_score(assessment_summary: dict):
-    """Display global expansion readiness score"""
-    st.markdown("### 🌍 Skor Ekspansi Global")
-
-    # Get the latest or average score with safe conversion
-    try:
-        latest_score = assessment_summary.get("latest_score", 0)
-        average_score = assessment_summary.get("average_score", 0)
-
-        # Convert to float first, then int
-        if latest_score:
-            score = int(float(latest_score))
-        elif average_score:
-            score = int(float(average_score))
-        else:
-            score = 0
-
-        # Ensure score is within valid range
-        score = max(0, min(100, score))
-    except (ValueError, TypeError):
-        score = 0
-
+@st.cache_data(ttl=3600, max_entries=128, show_spinner=False)
+def build_score_gauge_html(score: int, total_assessments: int) -> str:
+    """Build the circular expansion score card (memoized per score/count)"""
     # Determine readiness level and color
     if score >= 80:
         color = "#4CAF50"  # Green
@@ -452,9 +460,7 @@ def show_global_expansion_score(assessment_summary: dict):
         color = "#F44336"  # Red
         level = "Butuh Pengembangan"
 
-    # Create circular progress indicator
-    st.markdown(
-        f"""
+    return f"""
         <div style="
             background: linear-gradient(145deg, #ffffff, #f8f9fb);
             padding: 2rem;
@@ -490,10 +496,37 @@ def show_global_expansion_score(assessment_summary: dict):
             </div>
             <div style="font-weight: bold; color: #2c3e50; margin-bottom: 0.5rem;">{level}</div>
             <div style="font-size: 0.9rem; color: #7f8c8d;">
-                {assessment_summary.get("total_assessments", 0)} negara dinilai
+                {total_assessments} negara dinilai
             </div>
         </div>
-        """,
+        """
+
+
+def show_global_expansion_score(assessment_summary: dict):
+    """Display global expansion readiness score"""
+    st.markdown("### 🌍 Skor Ekspansi Global")
+
+    # Get the latest or average score with safe conversion
+    try:
+        latest_score = assessment_summary.get("latest_score", 0)
+        average_score = assessment_summary.get("average_score", 0)
+
+        # Convert to float first, then int
+        if latest_score:
+            score = int(float(latest_score))
+        elif average_score:
+            score = int(float(average_score))
+        else:
+            score = 0
+
+        # Ensure score is within valid range
+        score = max(0, min(100, score))
+    except (ValueError, TypeError):
+        score = 0
+
+    # Create circular progress indicator (cached across reruns)
+    st.markdown(
+        build_score_gauge_html(score, int(assessment_summary.get("total_assessments", 0))),
         unsafe_allow_html=True,
     )
 
@@ -502,45 +535,33 @@ def show_country_recommendations(assessment_summary: dict):
     """Display country recommendations panel"""
     st.markdown("### 🎯 Rekomendasi Negara Potensial")
 
-    # Country data with flags and difficulty levels
-    country_data = {
-        "Singapore": {"flag": "🇸🇬", "difficulty": "Mudah", "color": "#4CAF50"},
-        "Malaysia": {"flag": "🇲🇾", "difficulty": "Mudah", "color": "#4CAF50"},
-        "Australia": {"flag": "🇦🇺", "difficulty": "Sedang", "color": "#FF9800"},
-        "Japan": {"flag": "🇯🇵", "difficulty": "Sulit", "color": "#F44336"},
-        "Amerika Serikat": {"flag": "🇺🇸", "difficulty": "Sulit", "color": "#F44336"}
-    }
-
     # Get target countries and assessed countries with safe extraction
     target_countries = assessment_summary.get("target_countries", [])
     assessed_countries = assessment_summary.get("countries_assessed", [])
 
-    # Ensure we have lists
+    # Ensure we have lists, then index them as sets for O(1) membership
     if not isinstance(target_countries, list):
         target_countries = []
     if not isinstance(assessed_countries, list):
         assessed_countries = []
+    target_set = {c for c in target_countries if isinstance(c, str)}
+    assessed_set = {c for c in assessed_countries if isinstance(c, str)}
 
-    # Show recommendations
-    for country, data in country_data.items():
-        is_target = country in target_countries
-        is_assessed = country in assessed_countries
+    # Show recommendations as one markdown element
+    cards = []
+    for country, data in COUNTRY_CARD_DATA.items():
+        is_target = country in target_set
+        is_assessed = country in assessed_set
 
         # Determine card styling
         if is_assessed:
-            border_color = "#4CAF50"
-            bg_color = "rgba(76, 175, 80, 0.1)"
-            status = "✅ Dinilai"
+            border_color, bg_color, status = COUNTRY_CARD_STYLES["assessed"]
         elif is_target:
-            border_color = "#2196F3"
-            bg_color = "rgba(33, 150, 243, 0.1)"
-            status = "🎯 Target"
+            border_color, bg_color, status = COUNTRY_CARD_STYLES["target"]
         else:
-            border_color = "#e0e0e0"
-            bg_color = "#ffffff"
-            status = "📋 Tersedia"
+            border_color, bg_color, status = COUNTRY_CARD_STYLES["available"]
 
-        st.markdown(
+        cards.append(
             f"""
             <div style="
                 background: {bg_color};
@@ -561,10 +582,12 @@ def show_country_recommendations(assessment_summary: dict):
                     <div style="font-size: 0.8rem; color: #666;">{status}</div>
                 </div>
             </div>
-            """,
-            unsafe_allow_html=True,
+            """.strip()
         )
 
+    # Cards are joined without blank lines so they stay one HTML block
+    st.markdown("\n".join(cards), unsafe_allow_html=True)
+
     # Action button
     if st.button("🔍 Analisis Kesiapan Ekspor", use_container_width=True, key="analyze_readiness"):
         st.session_state.page = "chat"
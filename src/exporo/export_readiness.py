@@ -8,10 +8,19 @@ import streamlit as st
 import json
 from datetime import datetime
 from typing import Dict, List
-from PIL import Image
 
-from .config import DEFAULT_EXTRACTED_DATA, EXPORT_READINESS_PROMPT
-from .chat import init_gemini
+from .config import (
+    DEFAULT_EXTRACTED_DATA,
+    EXPORT_READINESS_PROMPT,
+    make_default_extracted_data,
+    now_iso,
+)
+from .chat import (
+    generate_with_retry,
+    init_gemini,
+    mark_memory_bot_changed,
+    strip_json_fence,
+)
 
 # For text embeddings and FAISS (will be implemented in Phase 2)
 # Lazy import to improve startup time
@@ -317,6 +326,9 @@ def display_product_image_upload():
     )
 
     if uploaded_file is not None:
+        # Imported lazily so PIL is only loaded once a user actually uploads
+        from PIL import Image
+
         # Display uploaded image
         image = Image.open(uploaded_file)
         st.image(image, caption="Uploaded Product Image", use_column_width=True)
@@ -334,14 +346,14 @@ def get_certification_requirements(
 def save_assessment_to_memory_bot(assessment_results: Dict):
     """Save assessment results to memory bot for tracking"""
     if "memory_bot" not in st.session_state:
-        st.session_state.memory_bot = DEFAULT_EXTRACTED_DATA.copy()
+        st.session_state.memory_bot = make_default_extracted_data()
 
     # Create assessment record
     assessment_record = {
         "country": assessment_results["country"]["name"],
         "country_code": assessment_results["country"]["code"],
         "score": assessment_results["overall_score"],
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now_iso(),
         "status": assessment_results.get("export_readiness_level", "Assessed"),
         "product": assessment_results["product_info"]["name"],
         "category": assessment_results["product_info"]["category"],
@@ -363,9 +375,9 @@ def save_assessment_to_memory_bot(assessment_results: Dict):
 
     # Update export readiness data
     if "export_readiness" not in st.session_state.memory_bot:
-        st.session_state.memory_bot["export_readiness"] = DEFAULT_EXTRACTED_DATA[
-            "export_readiness"
-        ].copy()
+        st.session_state.memory_bot["export_readiness"] = (
+            make_default_extracted_data()["export_readiness"]
+        )
 
     # Add target country if not already present
     target_countries = st.session_state.memory_bot["export_readiness"][
@@ -374,6 +386,8 @@ def save_assessment_to_memory_bot(assessment_results: Dict):
     if assessment_results["country"]["name"] not in target_countries:
         target_countries.append(assessment_results["country"]["name"])
 
+    mark_memory_bot_changed()
+
 
 def analyze_export_readiness() -> Dict:
     """Perform comprehensive AI-powered export readiness analysis"""
@@ -427,21 +441,12 @@ def analyze_export_readiness() -> Dict:
         )
 
         # Send to Gemini for analysis
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-exp", contents=formatted_prompt
+        response = generate_with_retry(
+            client, model="gemini-2.0-flash-exp", contents=formatted_prompt
         )
 
-        # Parse the AI response
-        ai_response = response.text.strip()
-
-        # Clean up the response (remove markdown formatting if any)
-        if ai_response.startswith("```json"):
-            ai_response = ai_response[7:]
-        if ai_response.endswith("```"):
-            ai_response = ai_response[:-3]
-
-        # Parse JSON response
-        assessment_data = json.loads(ai_response)
+        # Parse the AI response, dropping any markdown fence
+        assessment_data = json.loads(strip_json_fence(response.text))
 
         # Add additional metadata
         assessment_data.update(
@@ -0,0 +1,138 @@
+"""
+Chat history archive for Exporo SME Export Assistant
+Moves old chat messages and uploaded images out of session state onto disk
+"""
+
+import concurrent.futures
+import json
+import mimetypes
+import os
+import queue
+import shutil
+import threading
+import uuid
+
+CHAT_HISTORY_DIR = "data/chat_history"
+CHAT_UPLOADS_DIR = "data/chat_uploads"
+
+# Messages kept in st.session_state before older ones are archived to disk
+MAX_MESSAGES_IN_MEMORY = 40
+
+_ARCHIVE_QUEUE = queue.Queue()
+_writer_lock = threading.Lock()
+_writer_thread = None
+
+# Uploaded images are written off the script thread; pending writes by path
+_IMAGE_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=4, thread_name_prefix="chat-image-writer"
+)
+_pending_image_writes = {}
+_pending_lock = threading.Lock()
+
+
+def _history_path(session_id: str) -> str:
+    """Return the JSONL archive path for a chat session"""
+    return os.path.join(CHAT_HISTORY_DIR, f"{session_id}.jsonl")
+
+
+def _uploads_dir(session_id: str) -> str:
+    """Return the directory holding a chat session's uploaded images"""
+    return os.path.join(CHAT_UPLOADS_DIR, session_id)
+
+
+def _archive_record(message: dict) -> dict:
+    """Copy a message for the archive; images keep their path but not the inline thumbnail"""
+    record = {k: v for k, v in message.items() if k != "images" or v}
+    if record.get("images"):
+        record["images"] = [
+            {k: v for k, v in image.items() if k != "thumbnail"}
+            for image in record["images"]
+        ]
+    return record
+
+
+def _writer_loop():
+    """Drain the archive queue, appending or discarding session files"""
+    while True:
+        action, session_id, records = _ARCHIVE_QUEUE.get()
+        try:
+            path = _history_path(session_id)
+            if action == "append":
+                os.makedirs(CHAT_HISTORY_DIR, exist_ok=True)
+                with open(path, "a", encoding="utf-8") as f:
+                    for record in records:
+                        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            elif action == "discard":
+                if os.path.exists(path):
+                    os.remove(path)
+                shutil.rmtree(_uploads_dir(session_id), ignore_errors=True)
+        except Exception as e:
+            print(f"Chat history archive error: {e}")
+        finally:
+            _ARCHIVE_QUEUE.task_done()
+
+
+def _ensure_writer():
+    """Start the background writer thread on first use"""
+    global _writer_thread
+    with _writer_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(
+                target=_writer_loop, name="chat-history-writer", daemon=True
+            )
+            _writer_thread.start()
+
+
+def archive_old_messages(session_id: str, messages: list):
+    """Move all but the newest MAX_MESSAGES_IN_MEMORY messages to the session archive (in place)"""
+    overflow = len(messages) - MAX_MESSAGES_IN_MEMORY
+    if overflow <= 0:
+        return
+    old_messages = messages[:overflow]
+    del messages[:overflow]
+    _ensure_writer()
+    _ARCHIVE_QUEUE.put(
+        ("append", session_id, [_archive_record(msg) for msg in old_messages])
+    )
+
+
+def _write_image(path: str, image_bytes: bytes):
+    """Write image bytes to disk, then drop the pending-write entry"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(image_bytes)
+    finally:
+        with _pending_lock:
+            _pending_image_writes.pop(path, None)
+
+
+def store_image(session_id: str, image_bytes: bytes, mime_type: str) -> str:
+    """Queue an uploaded image for writing to disk and return its path"""
+    extension = mimetypes.guess_extension(mime_type) or ".bin"
+    path = os.path.join(_uploads_dir(session_id), f"{uuid.uuid4().hex}{extension}")
+    with _pending_lock:
+        _pending_image_writes[path] = _IMAGE_POOL.submit(
+            _write_image, path, image_bytes
+        )
+    return path
+
+
+def load_image(path: str) -> bytes:
+    """Read a stored image, waiting for its write to finish if still pending"""
+    with _pending_lock:
+        future = _pending_image_writes.get(path)
+    if future is not None:
+        future.result()
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def discard_history(session_id: str):
+    """Delete a session's archived messages and images (after pending writes)"""
+    prefix = _uploads_dir(session_id) + os.sep
+    with _pending_lock:
+        pending = [f for p, f in _pending_image_writes.items() if p.startswith(prefix)]
+    concurrent.futures.wait(pending)
+    _ensure_writer()
+    _ARCHIVE_QUEUE.put(("discard", session_id, None))
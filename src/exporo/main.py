@@ -3,8 +3,10 @@ Main entry point for Exporo SME Export Assistant
 Handles routing between login/auth and chat pages
 """
 
+from typing import Callable
+
 import streamlit as st
-from .config import APP_TITLE, APP_ICON, SHARED_CSS
+from .config import ADMIN_EMAILS, APP_TITLE, APP_ICON, SHARED_CSS_MIN, SIDEBAR_CSS_MIN
 from .auth import (
     init_db,
     init_auth_session_state,
@@ -16,6 +18,66 @@ from .auth import (
 )
 
 
+def _show_chat_page():
+    """Show the full chat page"""
+    from .chat import show_full_chat_page
+
+    show_full_chat_page()
+
+
+def _show_business_profile_page():
+    """Show the business profile page"""
+    from .auth import show_business_profile_page
+
+    show_business_profile_page()
+
+
+def _show_dashboard_page():
+    """Show the export dashboard page"""
+    from .dashboard import show_dashboard_page
+
+    show_dashboard_page()
+
+
+def _coming_soon(feature_key: str) -> Callable[[], None]:
+    """Build a page callable for a coming-soon feature"""
+
+    def show_page():
+        """Show the coming-soon page for this feature"""
+        from .auth import show_coming_soon_page
+
+        show_coming_soon_page(feature_key)
+
+    return show_page
+
+
+_FOOTER_TEXT = "© 2025 Exporo - Platform UMKM untuk Ekspor Global"
+
+# Combined <style> payloads, built once at import
+_GUEST_CSS = SHARED_CSS_MIN
+_MEMBER_CSS = SHARED_CSS_MIN + SIDEBAR_CSS_MIN
+
+# Page dispatch tables; heavy page modules are imported on first visit.
+# Only the active page's callable runs on a rerun, which is what st.navigation
+# would buy; routing stays on st.session_state.page because every nav button
+# callback and post-login redirect sets it directly.
+_AUTH_PAGES: dict[str, Callable[[], None]] = {
+    "login": show_login_page,
+    "signup": show_signup_page,
+}
+
+_MEMBER_PAGES: dict[str, Callable[[], None]] = {
+    "welcome": show_welcome_landing_page,
+    "chat": _show_chat_page,
+    "profil-bisnis": _show_business_profile_page,
+    "langkah-ekspor": _coming_soon("langkah-ekspor"),
+    "dokumen": _coming_soon("dokumen"),
+    "kualitas": _coming_soon("kualitas"),
+    "pasar-global": _coming_soon("pasar-global"),
+    "dashboard": _show_dashboard_page,
+}
+
+
 def main():
     """Main application entry point"""
     # Configure page
@@ -26,15 +88,17 @@ def main():
         initial_sidebar_state="collapsed",
     )
 
-    # Apply shared CSS
-    st.markdown(SHARED_CSS, unsafe_allow_html=True)
-
     # Initialize database and session state
     init_db()
     init_auth_session_state()
+    ss = st.session_state
+
+    # Apply page CSS in a single element; style-only st.html skips the
+    # markdown parser and adds no block spacing to the layout
+    st.html(_MEMBER_CSS if ss.logged_in else _GUEST_CSS)
 
     # Lazy import and initialize chat module only when needed
-    if st.session_state.get("logged_in", False):
+    if ss.get("logged_in", False):
         from .chat import init_chat_session_state
 
         init_chat_session_state()
@@ -43,68 +107,28 @@ def main():
     show_navigation()
 
     # Route based on authentication status and page
-    if not st.session_state.logged_in:
+    if not ss.logged_in:
         # Show authentication pages
-        if st.session_state.page == "login":
-            st.session_state.last_page = "login"
-            show_login_page()
-        elif st.session_state.page == "signup":
-            st.session_state.last_page = "signup"
-            show_signup_page()
+        page = ss.page
+        if page in _AUTH_PAGES:
+            ss.last_page = page
+            _AUTH_PAGES[page]()
     else:
-        # Show pages for logged-in users
-        if st.session_state.page == "welcome":
-            st.session_state.last_page = "welcome"
-            show_welcome_landing_page()
-        elif st.session_state.page == "chat":
-            from .chat import show_full_chat_page
-
-            show_full_chat_page()
-        elif st.session_state.page == "profil-bisnis":
-            st.session_state.last_page = "profil-bisnis"
-            from .auth import show_business_profile_page
-
-            show_business_profile_page()
-        elif st.session_state.page == "langkah-ekspor":
-            st.session_state.last_page = "langkah-ekspor"
-            from .auth import show_coming_soon_page
-
-            show_coming_soon_page("langkah-ekspor")
-        elif st.session_state.page == "dokumen":
-            st.session_state.last_page = "dokumen"
-            from .auth import show_coming_soon_page
-
-            show_coming_soon_page("dokumen")
-        elif st.session_state.page == "kualitas":
-            st.session_state.last_page = "kualitas"
-            from .auth import show_coming_soon_page
-
-            show_coming_soon_page("kualitas")
-        elif st.session_state.page == "pasar-global":
-            st.session_state.last_page = "pasar-global"
-            from .auth import show_coming_soon_page
-
-            show_coming_soon_page("pasar-global")
-        elif st.session_state.page == "dashboard":
-            st.session_state.last_page = "dashboard"
-            from .dashboard import show_dashboard_page
-
-            show_dashboard_page()
-        else:
-            # Default to welcome page for logged-in users
-            st.session_state.page = "welcome"
-            st.session_state.last_page = "welcome"
-            show_welcome_landing_page()
-
-    # Footer
+        # Show pages for logged-in users, defaulting to the welcome page
+        page = ss.page
+        if page not in _MEMBER_PAGES:
+            page = ss.page = "welcome"
+        # The chat page tracks last_page itself to detect navigation
+        if page != "chat":
+            ss.last_page = page
+        _MEMBER_PAGES[page]()
+
+    # Footer; only admins see the registered-user count
     st.markdown("---")
-    if st.session_state.logged_in:
-        user_count = get_user_count()
-        st.markdown(
-            f"© 2025 Exporo - Platform UMKM untuk Ekspor Global | Total Users: {user_count}"
-        )
-    else:
-        st.markdown("© 2025 Exporo - Platform UMKM untuk Ekspor Global")
+    footer = _FOOTER_TEXT
+    if ss.logged_in and ss.user["email"].lower() in ADMIN_EMAILS:
+        footer = f"{_FOOTER_TEXT} | Total Users: {get_user_count()}"
+    st.markdown(footer)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,72 @@
+"""
+Response schemas for Exporo SME Export Assistant
+Pydantic models passed to Gemini as response_schema for structured extraction
+"""
+
+from pydantic import BaseModel
+
+
+class ProductDetails(BaseModel):
+    """Product described in the conversation"""
+
+    name: str | None = None
+    description: str | None = None
+    unique_features: str | None = None
+
+
+class ProductionCapacity(BaseModel):
+    """Stated production capacity"""
+
+    amount: float | None = None
+    unit: str | None = None
+    timeframe: str | None = None
+
+
+class ProductionLocation(BaseModel):
+    """Where the product is made"""
+
+    city: str | None = None
+    province: str | None = None
+    country: str | None = None
+
+
+class ProfileExtraction(BaseModel):
+    """Business profile fields extracted by DATA_EXTRACTION_PROMPT"""
+
+    company_name: str | None = None
+    product_details: ProductDetails | None = None
+    production_capacity: ProductionCapacity | None = None
+    product_category: str | None = None
+    production_location: ProductionLocation | None = None
+    business_background: str | None = None
+    conversation_language: str | None = None
+
+
+class ExportReadiness(BaseModel):
+    """Export readiness fields extracted by EXPORT_DATA_EXTRACTION_PROMPT"""
+
+    target_countries: list[str] = []
+    export_experience: str | None = None
+    current_markets: list[str] = []
+    export_goals: str | None = None
+    budget_for_export: str | None = None
+    timeline_preference: str | None = None
+    main_challenges: list[str] = []
+    certifications_obtained: list[str] = []
+    export_volume_target: str | None = None
+
+
+class AssessmentRecord(BaseModel):
+    """A previous export readiness assessment mentioned in the conversation"""
+
+    country: str | None = None
+    score: float | None = None
+    timestamp: str | None = None
+    status: str | None = None
+
+
+class ExportExtraction(BaseModel):
+    """Top-level result of EXPORT_DATA_EXTRACTION_PROMPT"""
+
+    export_readiness: ExportReadiness | None = None
+    assessment_history: list[AssessmentRecord] = []